@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from playwright.async_api import async_playwright
+from blocker import ResourceBlocker
+from fetcher import fetch_all_pages, retry_failed_pages
+from gui import log_message, set_headless
+from main import find_installed_browser, install_playwright_browsers, launch_browser
+from page_cache import PageCache
+from rate_limiter import RateLimiter
+from search_cache import SearchCache
+from searcher import Pacing, resolve_search_url, slugify
+
+DEFAULT_CONCURRENCY = 3
+
+def load_batch_config(path):
+    """Read a batch file: {"concurrency": 3, "output_dir": "...", "searches": [{...}, ...]}.
+
+    Each search has a "name" and either a results "url" or the fields a
+    SearchPreset understands. "output" overrides the output file, which is
+    otherwise <output_dir>/<name>.csv.
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    searches = config.get("searches", [])
+    for i, search in enumerate(searches):
+        if not search.get("url") and not search.get("location"):
+            raise ValueError(f"Search #{i + 1} needs a 'url' or a 'location'")
+        search.setdefault("name", slugify(search.get("location") or f"search-{i + 1}"))
+    names = [search["name"] for search in searches]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Search names must be unique, repeated: {', '.join(duplicates)}")
+    return config
+
+async def run_search(context, search, output_csv, rate_limiter, page_cache=None, search_cache=None, pacing="fast"):
+    """Resolve one search to its results URL and crawl it into `output_csv`."""
+    if not search.get("url"):
+        log_message(f"🔎 [{search['name']}] Finding results for {search['location']}")
+    url = await resolve_search_url(context, search, rate_limiter, search_cache, Pacing(pacing))
+    if not url:
+        raise RuntimeError("search did not reach a results page")
+    log_message(f"📊 [{search['name']}] Crawling {url}")
+    output_csv = await fetch_all_pages(url, context, output_csv=output_csv, page_cache=page_cache,
+                                       rate_limiter=rate_limiter)
+    await retry_failed_pages(context, output_csv, rate_limiter=rate_limiter, page_cache=page_cache)
+    return output_csv
+
+async def run_batch(config, concurrency=None, cache_pages=True, headless=False, pacing="fast"):
+    """Run every search in `config` over one shared browser, at most `concurrency` at a time.
+
+    All searches share one rate limiter. Each caches its pages as its own page
+    cache run, "<batch start time>_<name>". A failing search is logged and does
+    not stop the others. Returns {name: output path or None}.
+    """
+    concurrency = concurrency or config.get("concurrency", DEFAULT_CONCURRENCY)
+    output_dir = Path(config.get("output_dir", "batch_output"))
+    output_dir.mkdir(parents=True, exist_ok=True)
+    started_at = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    browser_name, browser_executable = find_installed_browser()
+    if browser_executable is None:
+        install_playwright_browsers()
+
+    results = {}
+    async with async_playwright() as p:
+        context, browser = await launch_browser(p, browser_name, browser_executable, headless=headless)
+        blocker = ResourceBlocker()
+        await blocker.attach(context)
+        rate_limiter = RateLimiter()
+        # One instance for every search, so concurrent searches don't overwrite each other's entries
+        search_cache = SearchCache()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(search):
+            output_csv = search.get("output") or str(output_dir / f"{search['name']}.csv")
+            # Page numbers repeat across searches, so each needs its own run to be replayable
+            page_cache = PageCache(run_id=f"{started_at}_{search['name']}") if cache_pages else None
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    results[search["name"]] = await run_search(context, search, output_csv, rate_limiter, page_cache, search_cache,
+                                                             pacing)
+                    log_message(f"✅ [{search['name']}] Done in {time.perf_counter() - started:.0f}s")
+                except Exception as e:
+                    results[search["name"]] = None
+                    log_message(f"❌ [{search['name']}] Failed: {e}")
+
+        try:
+            log_message(f"🗂️ Running {len(config['searches'])} searches, {concurrency} at a time")
+            await asyncio.gather(*(run_one(search) for search in config["searches"]))
+        finally:
+            blocker.log_summary()
+            log_message(rate_limiter.summary())
+            await context.close()
+            if browser:
+                await browser.close()
+    return results
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run many saved searches from a JSON batch file.")
+    arg_parser.add_argument("config", help="batch file listing the searches")
+    arg_parser.add_argument("--concurrency", type=int, help=f"searches run at once (default: from the file, else {DEFAULT_CONCURRENCY})")
+    arg_parser.add_argument("--no-cache", action="store_true", help="don't save result pages to the page cache")
+    arg_parser.add_argument("--show-browser", action="store_true", help="run the browser with a window")
+    arg_parser.add_argument("--pacing", choices=Pacing.PROFILES, default="fast", help="how the search steps wait between actions")
+    args = arg_parser.parse_args()
+
+    set_headless()
+    results = asyncio.run(run_batch(load_batch_config(args.config), args.concurrency, not args.no_cache,
+                                    headless=not args.show_browser, pacing=args.pacing))
+    failed = [name for name, output in results.items() if output is None]
+    print(f"✅ {len(results) - len(failed)} of {len(results)} searches finished")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
@@ -0,0 +1,56 @@
+import argparse
+import time
+import tracemalloc
+from html_backends import available_backends
+from parser import parse_page
+
+def time_parse(pages, backend, restricted, repeat):
+    """Return (milliseconds per page, peak traced memory in KB) for one parse configuration."""
+    # Warm-up run also checks the configuration works on these pages
+    for html in pages:
+        parse_page(html, backend=backend, restricted=restricted)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            parse_page(html, backend=backend, restricted=restricted)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    for html in pages:
+        parse_page(html, backend=backend, restricted=restricted)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed / (repeat * len(pages)) * 1000, peak / 1024
+
+def run_benchmark(paths, repeat=5):
+    pages = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+
+    listing_count = sum(len(parse_page(html)["listings"]) for html in pages)
+    print(f"📄 {len(pages)} pages, {listing_count} listings, {repeat} repeats")
+    print(f"{'backend':<12} {'mode':<11} {'ms/page':>9} {'peak KB':>9} {'speedup':>8}")
+
+    baseline_ms = None
+    for backend in reversed(available_backends()):
+        for restricted in (False, True):
+            # The compiled engines ignore restricted mode, so only time their full parse
+            if restricted and backend != "html.parser":
+                continue
+            ms, peak_kb = time_parse(pages, backend, restricted, repeat)
+            if baseline_ms is None:
+                baseline_ms = ms
+            mode = "restricted" if restricted else "full"
+            print(f"{backend:<12} {mode:<11} {ms:>9.2f} {peak_kb:>9.0f} {baseline_ms / ms:>7.1f}x")
+
+    print("ℹ️ Peak KB only counts Python allocations; lxml and selectolax trees live in C memory.")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark result-page parsing on saved HTML files.")
+    arg_parser.add_argument("html_files", nargs="+", help="saved LoopNet result pages")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="timed passes over the pages")
+    args = arg_parser.parse_args()
+    run_benchmark(args.html_files, args.repeat)
@@ -0,0 +1,86 @@
+from urllib.parse import urlparse
+from gui import log_message
+
+# Resource types nothing in the scraper reads
+DEFAULT_BLOCKED_TYPES = {"image", "media", "font"}
+
+# Analytics, ad and session-replay hosts (subdomains are blocked too)
+DEFAULT_TRACKER_DOMAINS = {
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "bing.com",
+    "adsrvr.org",
+    "adnxs.com",
+    "demdex.net",
+    "omtrdc.net",
+    "nr-data.net",
+    "newrelic.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "criteo.com",
+    "linkedin.com",
+    "licdn.com",
+    "clarity.ms",
+}
+
+# Typical transfer sizes used to estimate the bandwidth saved by each aborted request
+ESTIMATED_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "script": 30_000,
+    "stylesheet": 20_000,
+}
+DEFAULT_ESTIMATED_BYTES = 5_000
+
+class ResourceBlocker:
+    """Aborts unneeded requests (by resource type or tracker domain) on a browser context.
+
+    Counts what it blocked so each run can report an estimate of the bandwidth saved.
+    """
+    def __init__(self, resource_types=None, tracker_domains=None):
+        self.resource_types = set(DEFAULT_BLOCKED_TYPES if resource_types is None else resource_types)
+        self.tracker_domains = set(DEFAULT_TRACKER_DOMAINS if tracker_domains is None else tracker_domains)
+        self.blocked_counts = {}
+        self.bytes_saved = 0
+
+    async def attach(self, context):
+        await context.route("**/*", self._handle_route)
+
+    async def detach(self, context):
+        await context.unroute("**/*", self._handle_route)
+
+    def is_tracker(self, url):
+        host = urlparse(url).hostname or ""
+        return any(host == domain or host.endswith("." + domain) for domain in self.tracker_domains)
+
+    def should_block(self, resource_type, url):
+        return resource_type in self.resource_types or self.is_tracker(url)
+
+    async def _handle_route(self, route):
+        request = route.request
+        try:
+            if self.should_block(request.resource_type, request.url):
+                kind = "tracker" if self.is_tracker(request.url) else request.resource_type
+                self.blocked_counts[kind] = self.blocked_counts.get(kind, 0) + 1
+                self.bytes_saved += ESTIMATED_BYTES.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+                await route.abort()
+            else:
+                await route.continue_()
+        except Exception:
+            # The page was closed while the request was in flight
+            pass
+
+    def summary(self):
+        total = sum(self.blocked_counts.values())
+        details = ", ".join(f"{kind} {count}" for kind, count in sorted(self.blocked_counts.items()))
+        return f"🛡️ Blocked {total} requests ({details or 'none'}), ~{self.bytes_saved / 1_000_000:.1f} MB saved"
+
+    def log_summary(self):
+        log_message(self.summary())
@@ -0,0 +1,88 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+def checkpoint_path_for(output_csv):
+    return Path(f"{output_csv}{CHECKPOINT_SUFFIX}")
+
+def find_unfinished_checkpoint(directory="."):
+    """Return the most recently updated checkpoint in `directory` whose crawl did not finish."""
+    unfinished = []
+    for path in Path(directory).glob(f"*{CHECKPOINT_SUFFIX}"):
+        try:
+            checkpoint = CrawlCheckpoint.load(path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping unreadable checkpoint {path}: {e}")
+            continue
+        if not checkpoint.completed and checkpoint.next_url:
+            unfinished.append(checkpoint)
+    if not unfinished:
+        return None
+    return max(unfinished, key=lambda checkpoint: checkpoint.updated_at)
+
+class CrawlCheckpoint:
+    """Progress of one crawl, saved after every completed page so it can be resumed.
+
+    Records the start URL, its sk parameter, the output file, the last page
+    written, the URL of the page after it and the listing IDs already written.
+    """
+    def __init__(self, path, start_url, output_csv):
+        self.path = Path(path)
+        self.start_url = start_url
+        self.output_csv = output_csv
+        self.sk_param = start_url[start_url.find("?sk="):] if "?sk=" in start_url else ""
+        self.last_page = 0
+        self.last_url = None
+        self.next_url = start_url
+        self.written_ids = set()
+        self.completed = False
+        self.updated_at = ""
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        checkpoint = cls(path, data["start_url"], data["output_csv"])
+        checkpoint.sk_param = data.get("sk_param", "")
+        checkpoint.last_page = data["last_page"]
+        checkpoint.last_url = data.get("last_url")
+        checkpoint.next_url = data.get("next_url")
+        checkpoint.written_ids = set(data.get("written_ids", []))
+        checkpoint.completed = data.get("completed", False)
+        checkpoint.updated_at = data.get("updated_at", "")
+        return checkpoint
+
+    def record_page(self, page_num, page_url, next_url, listing_ids):
+        """Mark `page_num` as fully written and save."""
+        self.last_page = page_num
+        self.last_url = page_url
+        self.next_url = next_url
+        self.written_ids.update(listing_ids)
+        self.save()
+
+    def mark_completed(self):
+        self.completed = True
+        self.next_url = None
+        self.save()
+
+    def save(self):
+        self.updated_at = datetime.now().isoformat(timespec="seconds")
+        data = {
+            "start_url": self.start_url,
+            "sk_param": self.sk_param,
+            "output_csv": self.output_csv,
+            "last_page": self.last_page,
+            "last_url": self.last_url,
+            "next_url": self.next_url,
+            "written_ids": sorted(self.written_ids),
+            "completed": self.completed,
+            "updated_at": self.updated_at,
+        }
+        # Write to a temp file first so a crash mid-save never corrupts the checkpoint
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
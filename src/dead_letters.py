@@ -0,0 +1,50 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+FAILED_PAGES_SUFFIX = ".failed.json"
+
+def failed_pages_path_for(output_csv):
+    return Path(f"{output_csv}{FAILED_PAGES_SUFFIX}")
+
+class DeadLetterQueue:
+    """Result pages a crawl gave up on, saved next to its output for a later retry pass.
+
+    Each entry records the page number, URL, last error and how many fetch
+    attempts the page has had. The file is removed once every page is resolved.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = {entry["url"]: entry for entry in json.load(f)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def pending(self):
+        """Entries in page order."""
+        return sorted(self.entries.values(), key=lambda entry: (entry["page"] is None, entry["page"] or 0))
+
+    def add(self, page_num, url, error, attempts=1):
+        entry = self.entries.setdefault(url, {"page": page_num, "url": url, "attempts": 0})
+        entry["error"] = str(error)
+        entry["attempts"] += attempts
+        entry["failed_at"] = datetime.now().isoformat(timespec="seconds")
+        self.save()
+
+    def resolve(self, url):
+        if self.entries.pop(url, None) is not None:
+            self.save()
+
+    def save(self):
+        if not self.entries:
+            self.path.unlink(missing_ok=True)
+            return
+        # Write to a temp file first so a crash mid-save never corrupts the list
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.pending(), f, indent=1)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,110 @@
+import hashlib
+import mmap
+import os
+import sys
+from bisect import bisect_left
+from pathlib import Path
+from gui import log_message
+
+DEFAULT_SEEN_PATH = Path(__file__).parent / "seen_listings.idx"
+EMPTY_INDEX = memoryview(b"").cast("Q")
+
+def listing_key(listing_id):
+    """64-bit hash of a Listing ID - 8 bytes per listing however long the ID is."""
+    return int.from_bytes(hashlib.blake2b(listing_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+class ListingDedup:
+    """Drops listings whose Listing ID was already seen, in this run or (optionally) earlier ones.
+
+    IDs seen in this run are kept in a set of 64-bit hashes. IDs from earlier
+    runs live in a sorted file of hashes that is memory-mapped and binary-searched,
+    so millions of them cost no memory beyond the OS page cache. This run's IDs
+    are merged into that file on save().
+    """
+    def __init__(self, path=DEFAULT_SEEN_PATH, across_runs=True):
+        self.path = Path(path)
+        self.across_runs = across_runs
+        self.run_keys = set()
+        self.duplicates_in_run = 0
+        self.duplicates_from_earlier_runs = 0
+        self._file = None
+        self._mmap = None
+        self._known = EMPTY_INDEX
+        if across_runs:
+            self._open_index()
+
+    @property
+    def suppressed(self):
+        return self.duplicates_in_run + self.duplicates_from_earlier_runs
+
+    def _seen_before(self, key):
+        i = bisect_left(self._known, key)
+        return i < len(self._known) and self._known[i] == key
+
+    def filter(self, listings):
+        """Return the listings not seen before, remembering them as seen."""
+        unique = []
+        for listing in listings:
+            if not listing["Listing ID"]:
+                unique.append(listing)
+                continue
+            key = listing_key(listing["Listing ID"])
+            if key in self.run_keys:
+                self.duplicates_in_run += 1
+            elif self._seen_before(key):
+                self.duplicates_from_earlier_runs += 1
+            else:
+                self.run_keys.add(key)
+                unique.append(listing)
+        return unique
+
+    def save(self):
+        """Merge this run's IDs into the on-disk index."""
+        if not self.across_runs:
+            return
+        new_keys = sorted(key for key in self.run_keys if not self._seen_before(key))
+        if not new_keys:
+            return
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            # Copy the existing index in runs between the insertion points of the new keys
+            start = 0
+            for key in new_keys:
+                end = bisect_left(self._known, key, start)
+                f.write(self._known[start:end])
+                f.write(key.to_bytes(8, sys.byteorder))
+                start = end
+            f.write(self._known[start:])
+        self._release()
+        # Swap the new index in only once it is complete
+        os.replace(tmp_path, self.path)
+        self._open_index()
+
+    def _open_index(self):
+        if not self.path.exists() or not self.path.stat().st_size:
+            return
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._known = memoryview(self._mmap).cast("Q")
+
+    def _release(self):
+        if self._known is not EMPTY_INDEX:
+            self._known.release()
+        self._known = EMPTY_INDEX
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self.save()
+        self._release()
+
+    def summary(self):
+        return (f"♻️ Suppressed {self.suppressed} duplicate listings "
+                f"({self.duplicates_in_run} within this run, {self.duplicates_from_earlier_runs} from earlier runs)")
+
+    def log_summary(self):
+        log_message(self.summary())
@@ -1,61 +1,564 @@
 import asyncio
-from parser import parse_articles_from_string, extract_next_page_url, append_to_csv
+import re
+from functools import partial
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from parser import parse_articles_from_string, parse_page, scan_next_page_url
 from gui import log_message
+from checkpoint import CrawlCheckpoint, checkpoint_path_for
+from sinks import open_sink, sink_class_for
+from rate_limiter import RateLimiter, BLOCK_MARKERS, is_block_response
+from dead_letters import DeadLetterQueue, failed_pages_path_for
 import time
 from datetime import datetime
 
-async def fetch_all_pages(url, context, output_csv=None):
-    if output_csv is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_csv = f"parsed_listings_{timestamp}.csv"
-    
-    page = await context.new_page()
+# Result URLs carry the page number as the last path segment, e.g. .../for-lease/2/?sk=...
+PAGE_NUMBER_PATTERN = re.compile(r"/(\d+)/?(?=\?|$)")
 
-    current_url = url
-    page_num = 1
+def build_page_url(page_two_url, page_num):
+    """Turn the page-2 URL (from page 1's NextPage link) into the URL of `page_num`."""
+    match = PAGE_NUMBER_PATTERN.search(page_two_url)
+    if not match:
+        return None
+    return page_two_url[:match.start(1)] + str(page_num) + page_two_url[match.end(1):]
 
-    while True:
-        log_message(f"🟢 Page {page_num}: {current_url}")
-        response_html = None
-        MAX_RETRIES = 3
-        attempt = 0
+def carry_sk_param(next_url, current_url):
+    # Extract the ?sk= parameter from current URL and append to next URL
+    if "?sk=" in current_url:
+        sk_param = current_url[current_url.find("?sk="):]
+        next_url = next_url + sk_param
+    return next_url
+
+# Consecutive blocked request-mode fetches before the rest of the crawl renders pages instead
+MAX_REQUEST_BLOCKS = 3
+# Consecutive failed pages the sequential crawl skips past before giving up
+MAX_SKIPPED_PAGES = 3
+
+def looks_blocked(html):
+    """True if the HTML looks like a block/challenge page rather than search results."""
+    lowered = html.lower()
+    return any(marker in lowered for marker in BLOCK_MARKERS) or "placard" not in lowered
+
+class PageLoader:
+    """Loads result-page HTML with retries.
+
+    In "render" mode each page is opened in a tab with page.goto. In "request"
+    mode the HTML is pulled through the tab's APIRequestContext, which shares the
+    browser's cookies but renders nothing; a blocked request falls back to a full
+    render, and repeated blocks switch the rest of the crawl to rendering.
 
-        while attempt < MAX_RETRIES and not response_html:
+    Every navigation waits its turn on `rate_limiter` (a RateLimiter, shared by
+    every tab) and reports blocked or throttled responses back to it. Retries
+    back off exponentially with jitter, unless a block has already paused the limiter.
+    """
+    def __init__(self, mode="render", max_retries=3, rate_limiter=None):
+        self.mode = mode
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.request_blocks = 0
+        self.errors = {}
+
+    async def fetch(self, page, url):
+        """Return the HTML of `url`, or None once every retry has failed (the last error goes in self.errors)."""
+        error = None
+        for attempt in range(self.max_retries):
             try:
-                response = await page.goto(current_url, wait_until="domcontentloaded", timeout=30000)
-                if response and response.status == 200:
-                    response_html = await response.text()
-                else:
-                    log_message(f"⚠️ Got status {response.status} on attempt {attempt + 1}")
+                response_html = await self._load(page, url, attempt)
+                if response_html:
+                    self.errors.pop(url, None)
+                    return response_html
+                error = "No usable response (blocked or bad status)"
             except Exception as e:
-                log_message(f"⚠️ Attempt {attempt + 1} failed to load {current_url}: {e}")
+                error = e
+                log_message(f"⚠️ Attempt {attempt + 1} failed to load {url}: {e}")
+            # After a block the limiter's own pause already delays the retry in acquire()
+            if attempt < self.max_retries - 1 and not self.rate_limiter.is_paused():
+                await asyncio.sleep(self.rate_limiter.backoff_delay(attempt))
+        self.errors[url] = str(error)
+        return None
 
-            if not response_html:
-                attempt += 1
-                await asyncio.sleep(2)
+    def _check_response(self, status, html):
+        """Report a response to the rate limiter. Returns False if it was a block page."""
+        if is_block_response(status, html):
+            self.rate_limiter.record_block(f"Blocked (HTTP {status})")
+            return False
+        if status == 200:
+            self.rate_limiter.record_success()
+        return True
 
-        if not response_html:
-            log_message("❌ Failed to capture HTML response after retries. Exiting.")
-            break
+    async def _load(self, page, url, attempt):
+        if self.mode == "request" and self.request_blocks < MAX_REQUEST_BLOCKS:
+            response_html = await self._request_html(page, url)
+            if response_html:
+                self.request_blocks = 0
+                return response_html
+            self.request_blocks += 1
+            if self.request_blocks >= MAX_REQUEST_BLOCKS:
+                log_message("⚠️ Request fetches keep getting blocked, rendering pages for the rest of the crawl.")
+            else:
+                log_message("⚠️ Request fetch blocked, falling back to full render.")
+        return await self._render_html(page, url, attempt)
 
-        listings = parse_articles_from_string(response_html)
-        if listings:
-            append_to_csv(listings, output_csv, append=(page_num > 1))
-            log_message(f"✅ Parsed and added {len(listings)} listings.")
-        else:
-            log_message("⚠️ No listings found on page.")
+    async def _request_html(self, page, url):
+        await self.rate_limiter.acquire()
+        try:
+            response = await page.request.get(url, timeout=30000, headers={"Accept": "text/html"})
+            response_html = await response.text()
+        except Exception as e:
+            log_message(f"⚠️ Request fetch failed for {url}: {e}")
+            return None
+        if not self._check_response(response.status, response_html) or response.status != 200:
+            return None
+        return None if looks_blocked(response_html) else response_html
+
+    async def _render_html(self, page, url, attempt):
+        await self.rate_limiter.acquire()
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        status = response.status if response else None
+        response_html = await response.text() if response else ""
+        if not self._check_response(status, response_html):
+            return None
+        if status == 200:
+            return response_html
+        log_message(f"⚠️ Got status {status} on attempt {attempt + 1}")
+        return None
+
+def _record_checkpoint(checkpoint, page_num, page_url, html, listing_ids):
+    # A finished crawl's retried pages only add their IDs, so it is never reopened
+    if page_num == checkpoint.last_page + 1 and not checkpoint.completed:
+        next_url = scan_next_page_url(html)
+        checkpoint.record_page(page_num, page_url, carry_sk_param(next_url, page_url) if next_url else None, listing_ids)
+    else:
+        # An earlier page was skipped, so a resume has to restart from that gap
+        checkpoint.written_ids.update(listing_ids)
+        checkpoint.save()
+
+def _record_page(checkpoint, listing_index, page_num, page_url, html, listings):
+    # Runs on the sink's writer thread once the page's rows are durable, so a
+    # crash never leaves listings marked as known that were not written
+    if listing_index is not None:
+        listing_index.record(listings)
+    if checkpoint is not None:
+        _record_checkpoint(checkpoint, page_num, page_url, html, [listing["Listing ID"] for listing in listings])
+
+async def _parse_worker(queue, executor, sink, stop_event, page_cache=None, checkpoint=None,
+                        listing_index=None, stop_after_unchanged_pages=None, dedup=None, dead_letters=None):
+    """Parse queued pages in the order they are queued, off the event loop, and hand them to `sink`.
+
+    Raw HTML is saved to `page_cache` first when one is given, and `checkpoint`
+    is updated once each page's rows are durable in the sink. Listings already
+    recorded in a resumed checkpoint are not written again, nor are listings
+    `dedup` (a ListingDedup) has already seen. With a
+    `listing_index` only new and changed listings are written, and after
+    `stop_after_unchanged_pages` pages in a row with neither the crawl stops
+    by setting `stop_event`. Pages that have no listings or fail to parse or
+    write are added to `dead_letters` (a DeadLetterQueue) for a later retry.
+    Returns (listings written, pages that failed to parse or write).
+    """
+    loop = asyncio.get_running_loop()
+    skip_ids = set(checkpoint.written_ids) if checkpoint is not None else set()
+    total = 0
+    failed = 0
+    unchanged_pages = 0
+
+    while True:
+        item = await queue.get()
+        if item is None:
             break
+        # Pages the crawler already parsed (see _crawl_concurrent) come with their listings
+        page_num, page_url, html, listings = item if len(item) == 4 else (*item, None)
+
+        if page_cache is not None:
+            try:
+                await loop.run_in_executor(None, page_cache.store, page_url, html, page_num)
+            except Exception as e:
+                log_message(f"⚠️ Could not cache page {page_num}: {e}")
+
+        try:
+            if listings is None:
+                listings = await loop.run_in_executor(executor, parse_articles_from_string, html)
+            if listings:
+                new_listings = [listing for listing in listings if listing["Listing ID"] not in skip_ids]
+                already_written = len(listings) - len(new_listings)
+                if dedup is not None:
+                    unique = dedup.filter(new_listings)
+                    if len(unique) < len(new_listings):
+                        log_message(f"♻️ Page {page_num}: skipped {len(new_listings) - len(unique)} duplicate listings.")
+                    new_listings = unique
+                if listing_index is not None:
+                    added, changed, unchanged = await loop.run_in_executor(None, listing_index.classify, new_listings)
+                    unchanged_ids = {listing["Listing ID"] for listing in unchanged}
+                    new_listings = [listing for listing in new_listings if listing["Listing ID"] not in unchanged_ids]
+
+                # The sink writes on its own thread, so disk latency never blocks the loop
+                sink.write(new_listings)
+                total += len(new_listings)
+                if listing_index is not None:
+                    log_message(f"✅ Page {page_num}: {len(added)} new, {len(changed)} changed, {len(unchanged)} unchanged listings.")
+                elif already_written:
+                    log_message(f"✅ Page {page_num}: added {len(new_listings)} listings ({already_written} already written before resume).")
+                else:
+                    log_message(f"✅ Page {page_num}: parsed and added {len(new_listings)} listings.")
+
+                if checkpoint is not None or listing_index is not None:
+                    sink.checkpoint(partial(_record_page, checkpoint, listing_index, page_num, page_url, html, listings))
+
+                if listing_index is not None and stop_after_unchanged_pages:
+                    unchanged_pages = 0 if new_listings else unchanged_pages + 1
+                    if unchanged_pages == stop_after_unchanged_pages:
+                        log_message(f"🔚 {unchanged_pages} pages in a row with nothing new. Stopping.")
+                        stop_event.set()
+            else:
+                log_message(f"⚠️ No listings found on page {page_num}.")
+                if dead_letters is not None:
+                    dead_letters.add(page_num, page_url, "No listings found")
+        except Exception as e:
+            log_message(f"❌ Failed to parse or write page {page_num}: {e}")
+            failed += 1
+            if dead_letters is not None:
+                dead_letters.add(page_num, page_url, e)
+
+    return total, failed
+
+async def _crawl_sequential(loader, page, url, queue, stop_event, start_page=1, prefetch_tab=None, dead_letters=None):
+    """Follow NextPage links one page at a time, queueing each page's HTML.
+
+    With a `prefetch_tab`, page N+1 is predicted from page N's URL and starts
+    loading in the other tab while page N is still on its way; the prefetch is
+    used if page N's NextPage link points at the predicted URL and discarded otherwise.
+    A page that cannot be fetched goes to `dead_letters`, and the crawl skips to
+    the URL predicted for the page after it, up to MAX_SKIPPED_PAGES in a row.
+    A first page with no listings and no NextPage link means the search has no
+    results, which finishes the crawl. Returns True if the crawl reached the
+    last page, False if it had to give up.
+    """
+    current_url = url
+    page_num = start_page
+    tab, spare_tab = page, prefetch_tab
+    prefetched = None  # (url, task) of the speculative fetch in spare_tab
+    skipped_in_a_row = 0
+
+    try:
+        while not stop_event.is_set():
+            log_message(f"🟢 Page {page_num}: {current_url}")
+            if prefetched and prefetched[0] == current_url:
+                fetch_task = prefetched[1]
+                tab, spare_tab = spare_tab, tab
+            else:
+                if prefetched:
+                    log_message(f"↩️ Prefetched {prefetched[0]} was not the next page, discarding it.")
+                    prefetched[1].cancel()
+                fetch_task = asyncio.create_task(loader.fetch(tab, current_url))
+            prefetched = None
+
+            if spare_tab is not None:
+                predicted_url = build_page_url(current_url, page_num + 1)
+                if predicted_url and predicted_url != current_url:
+                    prefetched = (predicted_url, asyncio.create_task(loader.fetch(spare_tab, predicted_url)))
+
+            response_html = await fetch_task
+            if response_html:
+                next_url = scan_next_page_url(response_html)
+                if page_num == 1 and not next_url and "placard" not in response_html.lower():
+                    log_message("🔚 The search has no results. Done.")
+                    break
+
+                # Waits here when the worker is queue_size pages behind (backpressure)
+                await queue.put((page_num, current_url, response_html))
 
-        next_url = extract_next_page_url(response_html)
-        if next_url:
-            # Extract the ?sk= parameter from current URL and append to next URL
-            if "?sk=" in current_url:
-                sk_param = current_url[current_url.find("?sk="):]
-                next_url = next_url + sk_param
+                if next_url:
+                    current_url = carry_sk_param(next_url, current_url)
+                    page_num += 1
+                    skipped_in_a_row = 0
+                    continue
+                if "placard" in response_html.lower():
+                    log_message("🔚 No next page found. Done.")
+                    break
+                # No listings and no NextPage link: not a real last page, the worker dead-letters it
+            else:
+                log_message(f"❌ Failed to capture page {page_num} after retries.")
+                if dead_letters is not None:
+                    dead_letters.add(page_num, current_url, loader.errors.get(current_url), loader.max_retries)
+
+            skipped_in_a_row += 1
+            next_url = build_page_url(current_url, page_num + 1)
+            if not next_url or skipped_in_a_row >= MAX_SKIPPED_PAGES:
+                log_message("❌ Cannot continue past the failed pages. Exiting.")
+                return False
+            log_message(f"⏭️ Skipping to page {page_num + 1}, page {page_num} can be retried later.")
             current_url = next_url
             page_num += 1
+    finally:
+        if prefetched:
+            prefetched[1].cancel()
+    return True
+
+async def _crawl_concurrent(loader, context, first_tab, url, queue, stop_event, executor, tabs, start_page=1,
+                           dead_letters=None):
+    """Fetch the first page, learn the page count from it, then fetch the rest across `tabs` tabs.
+
+    Pages are queued strictly in page order, whatever order their fetches finish in;
+    pages that cannot be fetched go to `dead_letters` and the crawl carries on.
+    Falls back to the sequential crawl when the page count or URL pattern is unknown,
+    and carries on sequentially when the last counted page still has a NextPage link.
+    Stops starting new fetches once `stop_event` is set.
+    Returns True if the crawl got to the last page (or the stop).
+    """
+    log_message(f"🟢 Page {start_page}: {url}")
+    first_html = await loader.fetch(first_tab, url)
+    if not first_html:
+        log_message("❌ Failed to capture HTML response after retries. Exiting.")
+        if dead_letters is not None:
+            dead_letters.add(start_page, url, loader.errors.get(url), loader.max_retries)
+        return False
+
+    loop = asyncio.get_running_loop()
+    parsed = await loop.run_in_executor(executor, parse_page, first_html)
+    if start_page == 1 and not parsed["listings"] and not parsed["next_url"]:
+        log_message("🔚 The search has no results. Done.")
+        return True
+    # Hand over the listings too, so the worker doesn't parse the page a second time
+    await queue.put((start_page, url, first_html, parsed["listings"]))
+    total_pages = parsed["total_pages"] or start_page
+    if not parsed["next_url"]:
+        log_message("🔚 No next page found. Done.")
+        return True
+
+    next_page_url = carry_sk_param(parsed["next_url"], url)
+    if total_pages <= start_page or build_page_url(next_page_url, start_page + 1) is None:
+        log_message("⚠️ Page count or page URL pattern unknown, continuing one page at a time.")
+        return await _crawl_sequential(loader, first_tab, next_page_url, queue, stop_event, start_page + 1,
+                                       dead_letters=dead_letters)
+
+    log_message(f"📑 {total_pages} pages found, fetching with {tabs} tabs")
+    free_tabs = [first_tab] + [await context.new_page() for _ in range(tabs - 1)]
+    semaphore = asyncio.Semaphore(len(free_tabs))
+
+    async def fetch(page_num, page_url):
+        async with semaphore:
+            tab = free_tabs.pop()
+            try:
+                log_message(f"🟢 Page {page_num}: {page_url}")
+                return await loader.fetch(tab, page_url)
+            finally:
+                free_tabs.append(tab)
+
+    # Start fetches at most two tabs' worth ahead of the page being queued
+    in_flight = deque()
+    last_page = {}  # HTML and URL of the last page in the count, to check it really is the last
+
+    async def queue_oldest():
+        page_num, page_url, task = in_flight.popleft()
+        html = await task
+        if html:
+            if page_num == total_pages:
+                last_page.update(html=html, url=page_url)
+            await queue.put((page_num, page_url, html))
         else:
-            log_message("🔚 No next page found. Done.")
-            break
-    
-    await page.close()
+            log_message(f"❌ Failed to capture page {page_num} after retries, skipping it.")
+            if dead_letters is not None:
+                dead_letters.add(page_num, page_url, loader.errors.get(page_url), loader.max_retries)
+
+    try:
+        for page_num in range(start_page + 1, total_pages + 1):
+            if stop_event.is_set():
+                break
+            page_url = build_page_url(next_page_url, page_num)
+            in_flight.append((page_num, page_url, asyncio.create_task(fetch(page_num, page_url))))
+            if len(in_flight) >= tabs * 2:
+                await queue_oldest()
+        while in_flight:
+            await queue_oldest()
+    finally:
+        for _, _, task in in_flight:
+            task.cancel()
+        for tab in free_tabs:
+            if tab is not first_tab:
+                await tab.close()
+
+    if stop_event.is_set():
+        return True
+    if not last_page:
+        # Its NextPage link can't be checked, so leave the crawl open to resume from it
+        log_message(f"⚠️ Could not check page {total_pages} for a next page.")
+        return False
+    # The pagination block may only show a window of page numbers
+    next_url = scan_next_page_url(last_page["html"])
+    if next_url:
+        log_message(f"📑 Page {total_pages} links to a next page, continuing one page at a time.")
+        return await _crawl_sequential(loader, first_tab, carry_sk_param(next_url, last_page["url"]), queue, stop_event,
+                                       total_pages + 1, dead_letters=dead_letters)
+    return True
+
+async def fetch_all_pages(url, context, output_csv=None, parse_in="thread", queue_size=4, tabs=1,
+                          fetch_mode="render", page_cache=None, checkpoints=True, resume=False, sink=None,
+                          listing_index=None, stop_after_unchanged_pages=3, dedup=None, prefetch=False,
+                          rate_limiter=None):
+    """Walk every result page starting at `url` and write its listings to `output_csv`.
+
+    Pages are handed to a parse/write worker through a bounded queue, so fetching
+    the next page overlaps with parsing the current one and the fetcher waits once
+    `queue_size` pages are backed up. `parse_in` picks a "thread" or "process" pool
+    for parsing. With `tabs` > 1 the page count is read from page 1 and the
+    remaining pages are fetched concurrently across that many tabs, still written
+    in page order. `fetch_mode="request"` pulls result HTML over HTTP with the
+    browser's cookies instead of rendering each page (see PageLoader). Every
+    fetched page is saved to `page_cache` (a PageCache) when one is given, so
+    the run can be replayed offline later. With `prefetch=True` a one-tab crawl
+    loads the predicted next page in a second tab while the current one is
+    still loading (see _crawl_sequential). Navigations are paced by
+    `rate_limiter` (a RateLimiter); pass the one the search used to share it.
+
+    Progress is checkpointed next to the CSV after every page (see CrawlCheckpoint).
+    With `resume=True` the crawl that was writing `output_csv` continues after its
+    last completed page, and `url` is ignored.
+
+    Rows go to `sink` (a ListingSink); by default the sink open_sink picks
+    for `output_csv` - a CSV, or a SQLite database for .db/.sqlite paths. A sink
+    that isn't durable (Parquet) gets no checkpoint, and refuses `resume` and
+    `listing_index`, since its rows only reach disk when it is closed.
+
+    With a `listing_index` (a ListingIndex) the crawl is incremental: only
+    listings that are new or whose content changed since they were last indexed
+    are written, and pagination stops after `stop_after_unchanged_pages`
+    consecutive pages with nothing new (None keeps going to the last page).
+
+    A `dedup` (a ListingDedup) drops listings repeated across pages, e.g.
+    promoted placards, and ones already seen by earlier runs.
+
+    Pages that fail are listed in `<output>.failed.json` (see DeadLetterQueue)
+    while the crawl carries on; retry_failed_pages refetches them later.
+    Returns the output path.
+    """
+    checkpoint = None
+    start_page = 1
+    if resume and output_csv is None:
+        raise ValueError("resume=True needs the output_csv of the crawl to continue")
+    if output_csv is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_csv = f"parsed_listings_{timestamp}.csv"
+    sink_class = type(sink) if sink is not None else sink_class_for(output_csv)
+    if not sink_class.durable:
+        # A checkpoint would record pages whose rows are not on disk yet
+        if resume:
+            raise ValueError(f"{output_csv} cannot be resumed: {sink_class.__name__} only writes its file when the crawl finishes")
+        if listing_index is not None:
+            raise ValueError(f"Incremental crawls need a durable output, not {sink_class.__name__}")
+        checkpoints = False
+
+    if resume:
+        checkpoint = CrawlCheckpoint.load(checkpoint_path_for(output_csv))
+        if checkpoint.completed or not checkpoint.next_url:
+            log_message(f"✅ Crawl for {output_csv} already finished, nothing to resume.")
+            return output_csv
+        url = checkpoint.next_url
+        start_page = checkpoint.last_page + 1
+        log_message(f"⏩ Resuming {output_csv} at page {start_page}")
+    elif checkpoints:
+        checkpoint = CrawlCheckpoint(checkpoint_path_for(output_csv), url, output_csv)
+        checkpoint.save()
+
+    if parse_in == "process":
+        executor = ProcessPoolExecutor(max_workers=1)
+    else:
+        executor = ThreadPoolExecutor(max_workers=1)
+    queue = asyncio.Queue(maxsize=queue_size)
+    stop_event = asyncio.Event()
+    dead_letters = DeadLetterQueue(failed_pages_path_for(output_csv))
+    if sink is None:
+        sink = open_sink(output_csv, append=checkpoint is not None and checkpoint.last_page > 0,
+                         source_url=checkpoint.start_url if checkpoint is not None else url)
+    worker = asyncio.create_task(_parse_worker(queue, executor, sink, stop_event, page_cache, checkpoint,
+                                               listing_index, stop_after_unchanged_pages, dedup, dead_letters))
+
+    loader = PageLoader(fetch_mode, rate_limiter=rate_limiter)
+    page = await context.new_page()
+    prefetch_tab = await context.new_page() if prefetch and tabs == 1 else None
+
+    reached_end = False
+    try:
+        if tabs > 1:
+            reached_end = await _crawl_concurrent(loader, context, page, url, queue, stop_event, executor, tabs, start_page,
+                                                  dead_letters)
+        else:
+            reached_end = await _crawl_sequential(loader, page, url, queue, stop_event, start_page, prefetch_tab,
+                                                  dead_letters)
+    finally:
+        await queue.put(None)
+        total, failed = await worker
+        executor.shutdown(wait=False)
+        await page.close()
+        if prefetch_tab is not None:
+            await prefetch_tab.close()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, sink.close)
+        except Exception as e:
+            log_message(f"❌ Failed to finish writing {output_csv}: {e}")
+            reached_end = False
+
+    log_message(f"💾 Wrote {total} listings to {output_csv}")
+    if len(dead_letters):
+        log_message(f"⚠️ {len(dead_letters)} pages failed ({failed} in parsing or writing) and were saved to "
+                    f"{dead_letters.path} - run `python retry_failed.py {output_csv}` to retry them.")
+    if checkpoint is not None:
+        # Dead-lettered pages are left to the retry pass, so they don't keep the crawl open
+        if reached_end:
+            checkpoint.mark_completed()
+        else:
+            log_message(f"⏸️ Crawl incomplete - resume it later from page {checkpoint.last_page + 1}.")
+    return output_csv
+
+async def retry_failed_pages(context, output_csv, fetch_mode="render", rate_limiter=None, page_cache=None,
+                             listing_index=None, dedup=None):
+    """Refetch the pages a crawl of `output_csv` gave up on and add their listings to it.
+
+    Refetched pages go through the same parse/write worker as the crawl, so the
+    crawl's `listing_index` and `dedup` filter them the same way, listings the
+    checkpoint records as written are skipped, and each recovered page is
+    recorded in the checkpoint so a later resume doesn't write it again. Pages
+    whose rows made it to disk are removed from the failed-page list, the rest
+    stay with their attempt counts raised. Returns the number of listings added.
+    """
+    dead_letters = DeadLetterQueue(failed_pages_path_for(output_csv))
+    if not len(dead_letters):
+        log_message(f"✅ No failed pages to retry for {output_csv}.")
+        return 0
+
+    checkpoint_path = checkpoint_path_for(output_csv)
+    checkpoint = CrawlCheckpoint.load(checkpoint_path) if checkpoint_path.exists() else None
+    log_message(f"🔁 Retrying {len(dead_letters)} failed pages of {output_csv}")
+    loader = PageLoader(fetch_mode, rate_limiter=rate_limiter)
+    executor = ThreadPoolExecutor(max_workers=1)
+    queue = asyncio.Queue(maxsize=4)
+    sink = open_sink(output_csv, append=True)
+    worker = asyncio.create_task(_parse_worker(queue, executor, sink, asyncio.Event(), page_cache, checkpoint,
+                                               listing_index, None, dedup, dead_letters))
+    page = await context.new_page()
+    # The worker raises a page's attempt count when it fails to parse or write it
+    queued = {}
+    try:
+        for entry in dead_letters.pending():
+            page_num, page_url = entry["page"], entry["url"]
+            log_message(f"🟢 Retrying page {page_num}: {page_url}")
+            html = await loader.fetch(page, page_url)
+            if not html:
+                dead_letters.add(page_num, page_url, loader.errors.get(page_url), loader.max_retries)
+                continue
+            queued[page_url] = entry["attempts"]
+            await queue.put((page_num, page_url, html))
+    finally:
+        await queue.put(None)
+        total, _ = await worker
+        executor.shutdown(wait=False)
+        await page.close()
+        await asyncio.get_running_loop().run_in_executor(None, sink.close)
+
+    # Only drop pages from the list once the sink has closed with their rows on disk
+    for page_url, attempts in queued.items():
+        entry = dead_letters.entries.get(page_url)
+        if entry is not None and entry["attempts"] == attempts:
+            dead_letters.resolve(page_url)
+    if len(dead_letters):
+        log_message(f"⚠️ {len(dead_letters)} pages still failing, kept in {dead_letters.path}")
+    log_message(f"💾 Added {total} listings to {output_csv}")
+    return total
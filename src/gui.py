@@ -782,6 +782,13 @@ class PropertySearchGUI:
 
 # Create global GUI instance
 _gui_instance = None
+# When set, messages go to stdout and no window is ever opened
+_headless = False
+
+def set_headless(headless=True):
+    """Print log and loading messages instead of showing the GUI window"""
+    global _headless
+    _headless = headless
 
 def get_gui_instance():
     """Get or create the GUI instance"""
@@ -827,22 +834,41 @@ def show_space_input_dialog():
 
 def show_loading_message(message="Loading..."):
     """Show a loading message using persistent window"""
+    if _headless:
+        print(f"⏳ {message}")
+        return
     gui = get_gui_instance()
     gui.show_loading_message(message)
 
 def log_message(message):
     """Log a message to the GUI log section"""
+    if _headless:
+        print(message, flush=True)
+        return
     gui = get_gui_instance()
     gui.log_message(message)
 
+def ask_resume_dialog(output_csv, last_page):
+    """Ask whether to resume an unfinished crawl instead of starting a new search"""
+    gui = get_gui_instance()
+    return messagebox.askyesno(
+        "Resume Crawl",
+        f"An unfinished crawl was found:\n{output_csv}\n(stopped after page {last_page})\n\nResume it?",
+        parent=gui.root,
+    )
+
 def show_failure_screen():
     """Show failure screen when connection fails after retries"""
+    if _headless:
+        return
     gui = get_gui_instance()
     gui.show_failure_message()
     gui.root.mainloop()  # Keep GUI open until user closes
 
 def show_completion_screen():
     """Show completion screen with finish button"""
+    if _headless:
+        return
     gui = get_gui_instance()
     gui.show_completion_message()
     gui.root.mainloop()  # Keep GUI open until user clicks finish
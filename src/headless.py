@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import json
+import time
+from playwright.async_api import async_playwright
+from gui import set_headless, log_message
+from blocker import ResourceBlocker
+from fetcher import fetch_all_pages, retry_failed_pages
+from main import find_installed_browser, install_playwright_browsers, launch_browser
+from page_cache import PageCache
+from rate_limiter import RateLimiter
+from searcher import Pacing, resolve_search_url
+
+def definition_from_args(args):
+    """Merge the --config file (if any) with the command-line search fields, which take precedence."""
+    definition = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            definition = json.load(f)
+    for field in ("url", "sale_type", "property_type", "location", "output"):
+        if getattr(args, field) is not None:
+            definition[field] = getattr(args, field)
+    if args.price_type or args.min_price or args.max_price:
+        definition["price"] = {"type": args.price_type, "min": args.min_price, "max": args.max_price}
+    if args.min_space or args.max_space:
+        definition["space"] = {"min": args.min_space, "max": args.max_space}
+    if not definition.get("url") and not definition.get("location"):
+        raise ValueError("Give a --url, a --location or a --config file with one of them")
+    return definition
+
+async def run_headless(definition, tabs=1, fetch_mode="render", prefetch=False, show_browser=False, cache_pages=True,
+                       pacing="fast"):
+    """Find the results URL for `definition` and crawl it, with no GUI. Returns the output path."""
+    started = time.perf_counter()
+    browser_name, browser_executable = find_installed_browser()
+    if browser_executable is None:
+        install_playwright_browsers()
+
+    async with async_playwright() as p:
+        context, browser = await launch_browser(p, browser_name, browser_executable, headless=not show_browser)
+        blocker = ResourceBlocker()
+        await blocker.attach(context)
+        rate_limiter = RateLimiter()
+        page_cache = PageCache() if cache_pages else None
+        try:
+            url = await resolve_search_url(context, definition, rate_limiter, pacing=Pacing(pacing))
+            if not url:
+                log_message("❌ No search URL obtained")
+                return None
+            log_message(f"⏱️ Results URL ready after {time.perf_counter() - started:.1f}s: {url}")
+
+            output = await fetch_all_pages(url, context, output_csv=definition.get("output"), tabs=tabs,
+                                           fetch_mode=fetch_mode, prefetch=prefetch, page_cache=page_cache,
+                                           rate_limiter=rate_limiter)
+            await retry_failed_pages(context, output, fetch_mode=fetch_mode, rate_limiter=rate_limiter,
+                                     page_cache=page_cache)
+        finally:
+            blocker.log_summary()
+            log_message(rate_limiter.summary())
+            await context.close()
+            if browser:
+                await browser.close()
+
+    log_message(f"🎉 Finished in {time.perf_counter() - started:.1f}s")
+    return output
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Search and crawl LoopNet.ca without the GUI.")
+    arg_parser.add_argument("--config", help="JSON file with one search definition (same fields as a batch search)")
+    arg_parser.add_argument("--url", help="results URL to crawl directly")
+    arg_parser.add_argument("--sale-type", choices=["lease", "sale"], help="default: lease")
+    arg_parser.add_argument("--property-type", help="e.g. Office, Industrial, Retail")
+    arg_parser.add_argument("--location", help='e.g. "Toronto, ON"')
+    arg_parser.add_argument("--price-type", help="price pill label to filter on, e.g. Total")
+    arg_parser.add_argument("--min-price")
+    arg_parser.add_argument("--max-price")
+    arg_parser.add_argument("--min-space", help="minimum SF")
+    arg_parser.add_argument("--max-space", help="maximum SF")
+    arg_parser.add_argument("-o", "--output", help="output file (default: parsed_listings_<timestamp>.csv)")
+    arg_parser.add_argument("--tabs", type=int, default=1, help="result pages fetched at once")
+    arg_parser.add_argument("--fetch-mode", choices=["render", "request"], default="render", help="how result pages are loaded")
+    arg_parser.add_argument("--prefetch", action="store_true", help="load the predicted next page in a second tab")
+    arg_parser.add_argument("--show-browser", action="store_true", help="run the browser with a window")
+    arg_parser.add_argument("--no-cache", action="store_true", help="don't save result pages to the page cache")
+    arg_parser.add_argument("--pacing", choices=Pacing.PROFILES, default="fast", help="how the search steps wait between actions")
+    args = arg_parser.parse_args()
+
+    set_headless()
+    asyncio.run(run_headless(definition_from_args(args), args.tabs, args.fetch_mode, args.prefetch,
+                             args.show_browser, not args.no_cache, args.pacing))
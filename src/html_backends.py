@@ -0,0 +1,157 @@
+from bs4 import BeautifulSoup
+
+# Optional faster parsers - the scraper still works with only beautifulsoup4 installed
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    from lxml.etree import ParserError
+except ImportError:
+    lxml = None
+    CSSSelector = None
+    ParserError = None
+
+
+class SoupBackend:
+    """BeautifulSoup with the pure-Python html.parser (always available, slowest)."""
+    name = "html.parser"
+
+    def parse(self, html, parse_only=None):
+        # parse_only is a SoupStrainer; only matching elements (and their subtrees) are built
+        return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+    def select(self, node, selector):
+        return node.select(selector)
+
+    def select_one(self, node, selector):
+        return node.select_one(selector)
+
+    def text(self, node):
+        return node.text
+
+    def attr(self, node, name, default=""):
+        value = node.get(name)
+        return default if value is None else value
+
+    def classes(self, node):
+        return node.get("class", [])
+
+
+class LxmlBackend:
+    """lxml.html tree with precompiled CSS selectors (needs lxml + cssselect)."""
+    name = "lxml"
+
+    def __init__(self):
+        self._compiled = {}
+        self._utf8_parser = None
+
+    def _selector(self, selector):
+        compiled = self._compiled.get(selector)
+        if compiled is None:
+            compiled = self._compiled[selector] = CSSSelector(selector)
+        return compiled
+
+    def parse(self, html, parse_only=None):
+        # The tree is built in C, so parse_only is ignored
+        if not html or not html.strip():
+            return self._empty_document()
+        parser = None
+        if isinstance(html, str) and html.lstrip().startswith("<?xml"):
+            # lxml refuses str input with an encoding declaration, so hand it UTF-8
+            # bytes and a parser that ignores whatever encoding the declaration names
+            if self._utf8_parser is None:
+                self._utf8_parser = lxml.html.HTMLParser(encoding="utf-8")
+            html, parser = html.encode("utf-8"), self._utf8_parser
+        try:
+            return lxml.html.document_fromstring(html, parser=parser)
+        except ParserError:
+            # e.g. "Document is empty" for a page that is only comments or whitespace
+            return self._empty_document()
+
+    def _empty_document(self):
+        return lxml.html.document_fromstring("<html></html>")
+
+    def select(self, node, selector):
+        return self._selector(selector)(node)
+
+    def select_one(self, node, selector):
+        matches = self._selector(selector)(node)
+        return matches[0] if matches else None
+
+    def text(self, node):
+        return node.text_content()
+
+    def attr(self, node, name, default=""):
+        value = node.get(name)
+        return default if value is None else value
+
+    def classes(self, node):
+        return node.get("class", "").split()
+
+
+class SelectolaxBackend:
+    """selectolax on the lexbor engine (fastest)."""
+    name = "selectolax"
+
+    def parse(self, html, parse_only=None):
+        # The tree is built in C, so parse_only is ignored
+        return LexborHTMLParser(html)
+
+    def select(self, node, selector):
+        return node.css(selector)
+
+    def select_one(self, node, selector):
+        return node.css_first(selector)
+
+    def text(self, node):
+        return node.text(deep=True)
+
+    def attr(self, node, name, default=""):
+        value = node.attributes.get(name)
+        return default if value is None else value
+
+    def classes(self, node):
+        return (node.attributes.get("class") or "").split()
+
+
+# Fastest first; the first available backend is used when none is requested
+BACKEND_PREFERENCE = ["selectolax", "lxml", "html.parser"]
+
+
+def available_backends():
+    """Return the names of the backends whose libraries are installed, fastest first."""
+    names = []
+    if LexborHTMLParser is not None:
+        names.append("selectolax")
+    if CSSSelector is not None:
+        names.append("lxml")
+    names.append("html.parser")
+    return names
+
+
+_instances = {}
+
+
+def get_backend(name=None):
+    """Return the backend called `name`, or the fastest installed one if `name` is None."""
+    if name is None:
+        name = available_backends()[0]
+    if name not in BACKEND_PREFERENCE:
+        raise ValueError(f"Unknown HTML backend '{name}', expected one of {BACKEND_PREFERENCE}")
+    if name not in available_backends():
+        raise ValueError(f"HTML backend '{name}' is not installed")
+
+    backend = _instances.get(name)
+    if backend is None:
+        if name == "selectolax":
+            backend = SelectolaxBackend()
+        elif name == "lxml":
+            backend = LxmlBackend()
+        else:
+            backend = SoupBackend()
+        _instances[name] = backend
+    return backend
@@ -0,0 +1,79 @@
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from parser import LISTING_FIELDS
+
+DEFAULT_INDEX_PATH = Path(__file__).parent / "listing_index.db"
+
+# Image URLs are left out of the content hash so a re-signed CDN link alone
+# does not make a listing look changed
+HASHED_FIELDS = [field for field in LISTING_FIELDS if field != "Images"]
+
+def content_hash(listing):
+    text = "\x1f".join(listing.get(field) or "" for field in HASHED_FIELDS)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class ListingIndex:
+    """Persistent map of every Listing ID seen so far to the hash of its content.
+
+    Used by incremental crawls to tell new and changed listings from ones that
+    are already known. Safe to use from several threads.
+    """
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS known_listings (
+                listing_id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def classify(self, listings):
+        """Split `listings` into (new, changed, unchanged) lists against the index."""
+        ids = [listing["Listing ID"] for listing in listings]
+        with self._lock:
+            known = {}
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                known.update(self._conn.execute(
+                    f"SELECT listing_id, content_hash FROM known_listings WHERE listing_id IN ({placeholders})", chunk
+                ).fetchall())
+
+        new, changed, unchanged = [], [], []
+        for listing in listings:
+            known_hash = known.get(listing["Listing ID"])
+            if known_hash is None:
+                new.append(listing)
+            elif known_hash != content_hash(listing):
+                changed.append(listing)
+            else:
+                unchanged.append(listing)
+        return new, changed, unchanged
+
+    def record(self, listings):
+        """Store the current content hash of `listings` and mark them as seen now."""
+        now = datetime.now().isoformat(timespec="seconds")
+        rows = [(listing["Listing ID"], content_hash(listing), now, now) for listing in listings if listing["Listing ID"]]
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                INSERT INTO known_listings (listing_id, content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?)
+                ON CONFLICT (listing_id) DO UPDATE SET content_hash = excluded.content_hash, last_seen = excluded.last_seen
+            """, rows)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM known_listings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -2,9 +2,15 @@ import subprocess
 import sys
 from pathlib import Path
 from playwright.sync_api import sync_playwright
-from fetcher import fetch_all_pages
-from searcher import select_autocomplete_option
-from gui import log_message, show_loading_message, show_completion_screen, close_gui
+from fetcher import fetch_all_pages, retry_failed_pages
+from blocker import ResourceBlocker
+from page_cache import PageCache
+from listing_index import ListingIndex
+from dedup import ListingDedup
+from rate_limiter import RateLimiter
+from checkpoint import find_unfinished_checkpoint
+from searcher import Pacing, select_autocomplete_option
+from gui import log_message, show_loading_message, show_completion_screen, close_gui, ask_resume_dialog
 from playwright.async_api import async_playwright
 import asyncio
 
@@ -16,6 +22,27 @@ BROWSER_PATHS = {
     "firefox": r"C:\Program Files\Mozilla Firefox\firefox.exe",
 }
 
+# Abort unneeded resource requests while searching and crawling
+BLOCK_RESOURCES = True
+# Keep raw result pages in src/page_cache so runs can be replayed offline with replay.py
+CACHE_PAGES = True
+# None writes a new timestamped CSV per run; a .db/.sqlite path (e.g. "listings.db")
+# upserts every run into one SQLite database instead
+OUTPUT_FILE = None
+# Only write listings that are new or changed since earlier runs (tracked in src/listing_index.db),
+# and stop after this many result pages in a row with nothing new
+INCREMENTAL = False
+STOP_AFTER_UNCHANGED_PAGES = 3
+# Skip listings repeated across result pages (e.g. promoted placards); with
+# DEDUPLICATE_ACROSS_RUNS also skip any listing an earlier run already wrote
+DEDUPLICATE = True
+DEDUPLICATE_ACROSS_RUNS = False
+# Refetch pages that failed during the crawl once it reaches the end
+RETRY_FAILED_PAGES = True
+# "fast" waits only on page state between search steps; "human" adds randomized
+# pauses and slow typing, in case the site starts flagging the search as automated
+SEARCH_PACING = "fast"
+
 def find_installed_browser():
     for name, path in BROWSER_PATHS.items():
         if Path(path).is_file():
@@ -33,6 +60,48 @@ def install_playwright_browsers():
         log_message(f"❌ Failed to install browsers: {e}")
         sys.exit(1)
 
+async def launch_browser(p, browser_name, browser_executable, headless=False):
+    """Open the browser context to scrape in. Returns (context, browser); browser is None for persistent contexts."""
+    browser = None
+    if browser_executable:
+        log_message(f"Launching installed browser '{browser_name}' at: {browser_executable}")
+        if browser_name == "firefox":
+            browser = await p.firefox.launch(
+                executable_path=browser_executable,
+                headless=headless,
+                args=["--window-position=-10000,-10000"],
+            )
+            context = await browser.new_context(
+                viewport={"width": 1280, "height": 720},
+                extra_http_headers={
+                    # your headers here
+                }
+            )
+        else:
+            # Chromium-based browsers, launch persistent context
+            context = await p.chromium.launch_persistent_context(
+                user_data_dir="./src/loopnet_profile",
+                executable_path=browser_executable,
+                headless=headless,
+                args=["--window-position=-10000,-10000"],
+                viewport={"width": 1280, "height": 720},
+                extra_http_headers={
+                    # your headers here
+                }
+            )
+    else:
+        log_message("⬇️ Launching default Chromium from Playwright...")
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir="./src/loopnet_profile",
+            headless=headless,
+            args=["--window-position=-10000,-10000"],
+            viewport={"width": 1280, "height": 720},
+            extra_http_headers={
+                # your headers here
+            }
+        )
+    return context, browser
+
 async def main():
     show_loading_message("Initializing Property Parser...")
     log_message("🚀 Starting Property Parser")
@@ -46,64 +115,68 @@ async def main():
     log_message("🔧 Configuring browser settings")
     
     async with async_playwright() as p:
-        if browser_executable:
-            log_message(f"Launching installed browser '{browser_name}' at: {browser_executable}")
-            if browser_name == "firefox":
-                browser = await p.firefox.launch(
-                    executable_path=browser_executable,
-                    headless=False,
-                    args=["--window-position=-10000,-10000"],
-                )
-                context = await browser.new_context(
-                    viewport={"width": 1280, "height": 720},
-                    extra_http_headers={
-                        # your headers here
-                    }
-                )
-            else:
-                # Chromium-based browsers, launch persistent context
-                context = await p.chromium.launch_persistent_context(
-                    user_data_dir="./src/loopnet_profile",
-                    executable_path=browser_executable,
-                    headless=False,
-                    args=["--window-position=-10000,-10000"],
-                    viewport={"width": 1280, "height": 720},
-                    extra_http_headers={
-                        # your headers here
-                    }
-                )
-        else:
-            log_message("⬇️ Launching default Chromium from Playwright...")
-            context = await p.chromium.launch_persistent_context(
-                user_data_dir="./src/loopnet_profile",
-                headless=False,
-                args=["--window-position=-10000,-10000"],
-                viewport={"width": 1280, "height": 720},
-                extra_http_headers={
-                    # your headers here
-                }
-            )
+        context, browser = await launch_browser(p, browser_name, browser_executable)
 
-        show_loading_message("Ready to start! Opening property search...")
-        log_message("🌐 Browser ready, starting property search")
+        # Skip images, fonts, media and trackers - nothing reads them and they cost bandwidth
+        blocker = None
+        if BLOCK_RESOURCES:
+            blocker = ResourceBlocker()
+            await blocker.attach(context)
 
-        final_url = await select_autocomplete_option(context)
-        log_message(f"🔗 Final search results URL: {final_url}")
+        # One rate limiter paces every navigation, in the search and the crawl alike
+        rate_limiter = RateLimiter()
+
+        # Offer to continue a crawl that stopped partway through instead of searching again
+        resume_csv = None
+        checkpoint = find_unfinished_checkpoint()
+        if checkpoint and ask_resume_dialog(checkpoint.output_csv, checkpoint.last_page):
+            resume_csv = checkpoint.output_csv
+            final_url = checkpoint.next_url
+            log_message(f"⏩ Resuming {resume_csv} after page {checkpoint.last_page}")
+        else:
+            show_loading_message("Ready to start! Opening property search...")
+            log_message("🌐 Browser ready, starting property search")
+
+            final_url = await select_autocomplete_option(context, rate_limiter, pacing=Pacing(SEARCH_PACING))
+            log_message(f"🔗 Final search results URL: {final_url}")
 
         if final_url:
             show_loading_message("Fetching property listings...")
             log_message("📊 Starting data collection from search results")
-            await fetch_all_pages(final_url, context)
+            page_cache = PageCache() if CACHE_PAGES else None
+            listing_index = ListingIndex() if INCREMENTAL else None
+            # Changed listings must get through in incremental mode, so only drop repeats within the run there
+            dedup = ListingDedup(across_runs=DEDUPLICATE_ACROSS_RUNS and not INCREMENTAL) if DEDUPLICATE else None
+            try:
+                output = await fetch_all_pages(final_url, context, output_csv=resume_csv or OUTPUT_FILE,
+                                               page_cache=page_cache, resume=resume_csv is not None,
+                                               listing_index=listing_index,
+                                               stop_after_unchanged_pages=STOP_AFTER_UNCHANGED_PAGES, dedup=dedup,
+                                               rate_limiter=rate_limiter)
+                if RETRY_FAILED_PAGES:
+                    await retry_failed_pages(context, output, rate_limiter=rate_limiter, page_cache=page_cache,
+                                             listing_index=listing_index, dedup=dedup)
+            finally:
+                if listing_index:
+                    listing_index.close()
+                if dedup:
+                    dedup.close()
+                    dedup.log_summary()
             
             show_loading_message("Processing results...")
             log_message("✅ Property data collection finished successfully")
-            await asyncio.sleep(3)  # Give user time to see completion message
+            if SEARCH_PACING == "human":
+                await asyncio.sleep(3)  # Give user time to see completion message
         else:
             log_message("❌ No search URL obtained - process cancelled")
 
+        if blocker:
+            blocker.log_summary()
+        log_message(rate_limiter.summary())
+
         log_message("🧹 Cleaning up browser resources")
         await context.close()
-        if browser_executable and browser_name == "firefox":
+        if browser:
             await browser.close()
         
         log_message("🎉 Property Parser completed successfully!")
@@ -0,0 +1,91 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / "page_cache"
+
+class PageCache:
+    """Content-addressed, gzip-compressed store of raw result-page HTML.
+
+    Each page body is saved once under its SHA-256 digest in objects/, and every
+    fetch appends a line to index.jsonl recording the run, page number, URL,
+    timestamp and digest. Replaying a run reads its pages back in page order
+    without a browser.
+    """
+    # Shared by every instance, since concurrent runs (e.g. batch searches) append to the same index
+    _lock = threading.Lock()
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, run_id=None):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.index_path = self.cache_dir / "index.jsonl"
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    def object_path(self, digest):
+        return self.objects_dir / digest[:2] / f"{digest}.html.gz"
+
+    def store(self, url, html, page_num=None):
+        """Save a fetched page and return its digest. Identical pages share one object."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+
+        with self._lock:
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write to a temp file first so a crash never leaves a truncated object
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_bytes(gzip.compress(data, compresslevel=6))
+                os.replace(tmp_path, path)
+
+            entry = {
+                "run": self.run_id,
+                "page": page_num,
+                "url": url,
+                "fetched_at": datetime.now().isoformat(timespec="seconds"),
+                "sha256": digest,
+            }
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return digest
+
+    def load(self, digest):
+        with gzip.open(self.object_path(digest), "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def entries(self):
+        if not self.index_path.exists():
+            return []
+        with open(self.index_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def runs(self):
+        """Run ids in the order they were first cached."""
+        seen = []
+        for entry in self.entries():
+            if entry["run"] not in seen:
+                seen.append(entry["run"])
+        return seen
+
+    def run_pages(self, run_id=None):
+        """Index entries of one run (the latest by default), one per page, in page order."""
+        if run_id is None:
+            runs = self.runs()
+            if not runs:
+                return []
+            run_id = runs[-1]
+
+        # A page fetched twice in the same run (e.g. on retry) keeps its last copy
+        pages = {}
+        for entry in self.entries():
+            if entry["run"] == run_id:
+                pages[entry["page"]] = entry
+        return [pages[num] for num in sorted(pages, key=lambda num: (num is None, num or 0))]
+
+    def run_paths(self, run_id=None):
+        """Object file paths of one run's pages in page order, ready for parse_many_files."""
+        return [self.object_path(entry["sha256"]) for entry in self.run_pages(run_id)]
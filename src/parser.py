@@ -1,6 +1,26 @@
-from bs4 import BeautifulSoup
-import csv
+import gzip
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+from bs4 import SoupStrainer
+from html_backends import get_backend
+
+# Columns of every listing row, in output order
+LISTING_FIELDS = ["Listing ID", "URL", "Address", "Location", "Postal Code", "Company", "Price (CAD/SF/Year)", "Cap Rate", "Size (SF)", "Images"]
+
+# Numbered page links in the pagination block under the result placards
+PAGINATION_LINK_SELECTOR = ".pagination a, .paging a"
+
+# Raw-HTML patterns for scan_next_page_url
+NEXT_LINK_TAG_PATTERN = re.compile(r"<a\s[^>]*NextPage[^>]*>", re.IGNORECASE)
+NEXT_PAGE_ATTR_PATTERN = re.compile(r"""data-automation-id\s*=\s*["']NextPage["']""")
+HREF_ATTR_PATTERN = re.compile(r"""\shref\s*=\s*(["'])(.*?)\1""", re.IGNORECASE | re.DOTALL)
+
+# Restricted parsing keeps only the placards and the pagination block (which holds the
+# NextPage link). Class values are matched as the raw attribute string while parsing.
+RESULTS_STRAINER = SoupStrainer(attrs={"class": re.compile(r"(^|\s)(placard|pagination|paging)(\s|$)")})
 
 def extract_cap_rate_year(text):
     """Extract only the year from 'Built in xxxx' format or return 'upon request'."""
@@ -38,6 +58,17 @@ def extract_numbers_only(text):
     # If no numbers found, return original text
     return text
 
+def parse_number_range(text):
+    """Turn an extract_numbers_only value into (min, max) floats.
+
+    "1,000 - 2,000" gives (1000.0, 2000.0), "5,400" gives (5400.0, 5400.0) and
+    "upon request" or any text without numbers gives (None, None).
+    """
+    numbers = [float(n.replace(",", "")) for n in re.findall(r'\d[\d,]*(?:\.\d+)?', text or "")]
+    if not numbers:
+        return None, None
+    return min(numbers), max(numbers)
+
 def separate_location_and_postal_code(location_text):
     """Separate location into city/state and postal code."""
     if not location_text:
@@ -55,71 +86,86 @@ def separate_location_and_postal_code(location_text):
         # If no postal code found, return original as city_state
         return location_text.strip(), ""
 
-def parse_articles_from_string(html):
-    soup = BeautifulSoup(html, "html.parser")
-    articles = soup.find_all("article", class_="placard")
+def _parse_root(b, html, restricted):
+    return b.parse(html, parse_only=RESULTS_STRAINER if restricted else None)
+
+def parse_articles_from_string(html, backend=None, restricted=False):
+    """Parse all listing placards in a result page.
+
+    `backend` names the HTML engine ("selectolax", "lxml" or "html.parser");
+    by default the fastest installed one is used. With `restricted=True` the
+    html.parser backend only builds the placards and pagination block instead
+    of the whole page.
+    """
+    b = get_backend(backend)
+    return _parse_articles(b, _parse_root(b, html, restricted))
+
+def _parse_articles(b, root):
+    articles = b.select(root, "article.placard")
 
     listings = []
     for art in articles:
-        listing_id = art.get("data-id", "").strip()
+        listing_id = b.attr(art, "data-id").strip()
+        is_tier2 = "tier2" in b.classes(art)
 
         # Best a_tag with text (Address)
-        a_tag = art.select_one("header h4 a")
-        url = a_tag["href"].strip() if a_tag and a_tag.has_attr("href") else ""
-        address = a_tag.text.strip() if a_tag else ""
+        a_tag = b.select_one(art, "header h4 a")
+        url = b.attr(a_tag, "href").strip() if a_tag is not None else ""
+        address = b.text(a_tag).strip() if a_tag is not None else ""
 
         # Location (e.g. City + Zip)
         # Check if article has "tier2" in class, if so get location from header h6 a
-        if "tier2" in art.get("class", []):
-            location_tag = art.select_one("header h6 a")
-            location_full = location_tag.text.strip() if location_tag else ""
+        if is_tier2:
+            location_tag = b.select_one(art, "header h6 a")
+            location_full = b.text(location_tag).strip() if location_tag is not None else ""
         else:
-            subtitle_tag = art.select_one("header .subtitle-beta")
-            location_full = subtitle_tag.text.strip() if subtitle_tag else ""
+            subtitle_tag = b.select_one(art, "header .subtitle-beta")
+            location_full = b.text(subtitle_tag).strip() if subtitle_tag is not None else ""
         
         # Separate location into city/state and postal code
         location, postal_code = separate_location_and_postal_code(location_full)
 
         # Company name
-        if "tier2" in art.get("class", []):
+        if is_tier2:
             # For tier2 articles, get company from ul.contacts li title
-            contact_li = art.select_one("ul.contacts li")
-            company = contact_li.get("title", "").strip() if contact_li else ""
+            contact_li = b.select_one(art, "ul.contacts li")
+            company = b.attr(contact_li, "title").strip() if contact_li is not None else ""
         else:
-            company_tag = art.select_one(".company-logos li.company-name p")
-            if company_tag:
-                company = company_tag.text.strip()
+            company_tag = b.select_one(art, ".company-logos li.company-name p")
+            if company_tag is not None:
+                company = b.text(company_tag).strip()
             else:
                 # Fallback to li.company-logo img alt text
-                logo_img = art.select_one(".company-logos li.company-logo img")
-                company = logo_img.get("alt", "").strip() if logo_img else ""
+                logo_img = b.select_one(art, ".company-logos li.company-logo img")
+                company = b.attr(logo_img, "alt").strip() if logo_img is not None else ""
 
         # Price, Cap Rate, Size
-        if "tier2" in art.get("class", []):
+        if is_tier2:
             # For tier2 articles, extract price and cap_rate from ul.data-points-a
-            data_points_a = art.select("ul.data-points-a li")
+            data_points_a = b.select(art, "ul.data-points-a li")
             
             price = "upon request"
             cap_rate = "upon request"
             
             for li in data_points_a:
-                li_text = li.text.strip()
+                li_text = b.text(li).strip()
+                is_price = "$" in li_text or "CAD/SF/YR" in li_text or b.attr(li, "name") == "Price"
                 # Look for price indicator (contains $ or CAD/SF/YR)
-                if "$" in li_text or "CAD/SF/YR" in li_text or li.get("name") == "Price":
+                if is_price:
                     price = extract_numbers_only(li_text)
                 # Look for cap rate info (contains "Built in") - only from non-Price elements
-                elif "Built in" in li_text and not ("$" in li_text or "CAD/SF/YR" in li_text or li.get("name") == "Price"):
+                elif "Built in" in li_text:
                     cap_rate = extract_cap_rate_year(li_text)
             
             # Size for tier2: always get from header .text-right h4 a
-            size_tag = art.select_one("header .text-right h4 a")
-            size = extract_numbers_only(size_tag.text.strip()) if size_tag else ""
+            size_tag = b.select_one(art, "header .text-right h4 a")
+            size = extract_numbers_only(b.text(size_tag).strip()) if size_tag is not None else ""
         else:
             # For non-tier2 articles
-            data_points = art.select("ul.data-points-2c li")
+            data_points = b.select(art, "ul.data-points-2c li")
             
-            price_element = art.select_one('ul.data-points-2c li[name="Price"]')
-            price = extract_numbers_only(price_element.text.strip()) if price_element else "upon request"
+            price_element = b.select_one(art, 'ul.data-points-2c li[name="Price"]')
+            price = extract_numbers_only(b.text(price_element).strip()) if price_element is not None else "upon request"
             
             size = "upon request"
             cap_rate = "upon request"
@@ -127,9 +173,9 @@ def parse_articles_from_string(html):
             # Parse data_points to identify size (contains SF) and cap_rate (contains Built in)
             # Exclude Price elements when looking for size and cap_rate
             for li in data_points:
-                li_text = li.text.strip()
+                li_text = b.text(li).strip()
                 # Skip if this is a Price element
-                if "$" in li_text or "CAD/SF/YR" in li_text or li.get("name") == "Price":
+                if "$" in li_text or "CAD/SF/YR" in li_text or b.attr(li, "name") == "Price":
                     continue
                     
                 if "SF" in li_text:
@@ -139,18 +185,18 @@ def parse_articles_from_string(html):
 
         # Image URLs
         images = []
-        for figure in art.select("figure"):
+        for figure in b.select(art, "figure"):
             # Try to get background-image from style attribute
-            style = figure.get("style", "")
+            style = b.attr(figure, "style")
             if "background-image" in style:
                 start = style.find("url(")
                 end = style.find(")", start)
                 if start != -1 and end != -1:
                     images.append(style[start+4:end].strip('"').strip("'"))
             # Else try <img src=...> or lazy-src
-            img = figure.find("img")
-            if img:
-                src = img.get("src") or img.get("lazy-src")
+            img = b.select_one(figure, "img")
+            if img is not None:
+                src = b.attr(img, "src") or b.attr(img, "lazy-src")
                 if src:
                     images.append(src)
 
@@ -170,18 +216,106 @@ def parse_articles_from_string(html):
 
     return listings
 
-def extract_next_page_url(html):
-    soup = BeautifulSoup(html, "html.parser")
-    next_link = soup.select_one('a[data-automation-id="NextPage"]')
-    if next_link and next_link.has_attr("href"):
-        return next_link["href"]
+def extract_next_page_url(html, backend=None, restricted=False):
+    b = get_backend(backend)
+    return _next_page_url(b, _parse_root(b, html, restricted))
+
+def _next_page_url(b, root):
+    next_link = b.select_one(root, 'a[data-automation-id="NextPage"]')
+    if next_link is not None and b.attr(next_link, "href", None) is not None:
+        return b.attr(next_link, "href")
     return None
 
-def append_to_csv(listings, output_csv, append=True):
-    mode = "a" if append else "w"
-    keys = ["Listing ID", "URL", "Address", "Location", "Postal Code", "Company", "Price (CAD/SF/Year)", "Cap Rate", "Size (SF)", "Images"]
-    with open(output_csv, mode, newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=keys)
-        if not append:
-            writer.writeheader()
-        writer.writerows(listings)
+def scan_next_page_url(html):
+    """Find the NextPage href by scanning the raw HTML, without building a tree.
+
+    This takes microseconds, so the fetcher can learn the next URL before the
+    page itself has been parsed.
+    """
+    for tag in NEXT_LINK_TAG_PATTERN.findall(html):
+        if NEXT_PAGE_ATTR_PATTERN.search(tag):
+            href = HREF_ATTR_PATTERN.search(tag)
+            if href:
+                return unescape(href.group(2))
+    return None
+
+def _total_pages(b, root):
+    """Highest page number linked from the pagination block, or None if there is none."""
+    numbers = []
+    for link in b.select(root, PAGINATION_LINK_SELECTOR):
+        text = b.text(link).strip()
+        if text.isdigit():
+            numbers.append(int(text))
+    return max(numbers) if numbers else None
+
+def parse_page(html, backend=None, restricted=False):
+    """Parse a result page once and return everything the fetcher needs from it.
+
+    Returns a dict with the page's "listings", the "next_url" from the NextPage
+    link (or None on the last page) and "total_pages" from the pagination block
+    (or None if the page has no numbered page links). `backend` and
+    `restricted` work as in parse_articles_from_string.
+    """
+    b = get_backend(backend)
+    root = _parse_root(b, html, restricted)
+    return {
+        "listings": _parse_articles(b, root),
+        "next_url": _next_page_url(b, root),
+        "total_pages": _total_pages(b, root),
+    }
+
+def _parse_html_chunk(pages, backend, restricted):
+    return [parse_articles_from_string(html, backend, restricted) for html in pages]
+
+def _parse_file_chunk(paths, backend, restricted):
+    results = []
+    for path in paths:
+        # Pages from the page cache are gzip-compressed
+        opener = gzip.open if str(path).endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            results.append(parse_articles_from_string(f.read(), backend, restricted))
+    return results
+
+def _chunked(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _run_chunks(worker, items, workers, chunk_size, backend, restricted):
+    """Run `worker` over chunks of `items` in a process pool, yielding per-item results in order.
+
+    At most two chunks per worker are in flight, so huge archives are never held in memory at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunked(items, chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            yield from worker(chunk, backend, restricted)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        max_in_flight = workers * 2
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(worker, chunk, backend, restricted))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def parse_many(html_pages, workers=None, chunk_size=16, backend=None, restricted=False):
+    """Parse many result pages across CPU cores, yielding each page's listings in input order.
+
+    Pages are sent to worker processes `chunk_size` at a time so pickling overhead
+    stays small; `workers` defaults to the CPU count and `workers=1` parses inline.
+    """
+    return _run_chunks(_parse_html_chunk, html_pages, workers, chunk_size, backend, restricted)
+
+def parse_many_files(paths, workers=None, chunk_size=16, backend=None, restricted=False):
+    """Like parse_many, but workers read the HTML (or .html.gz) files themselves so only paths are pickled."""
+    return _run_chunks(_parse_file_chunk, paths, workers, chunk_size, backend, restricted)
@@ -0,0 +1,87 @@
+import asyncio
+import random
+import time
+from gui import log_message
+
+# Statuses the site answers with when it throttles or blocks us
+BLOCK_STATUSES = {403, 429, 503}
+# Markers of a bot-challenge page served instead of the real one
+BLOCK_MARKERS = ("access denied", "px-captcha", "request unsuccessful", "pardon our interruption")
+
+def is_block_response(status, html=""):
+    """True if a response looks like the site is throttling or blocking us."""
+    lowered = (html or "").lower()
+    return status in BLOCK_STATUSES or any(marker in lowered for marker in BLOCK_MARKERS)
+
+class RateLimiter:
+    """Token bucket shared by every navigation, adapting its rate to how the site responds.
+
+    Starts at `rate` navigations per second with up to `burst` at once. A blocked
+    or throttled response halves the rate and pauses all navigations for an
+    exponentially growing, jittered delay. Every `ramp_up_after` clean responses
+    in a row raise the rate by `ramp_up_step`, up to `max_rate`, so the crawl
+    settles near the fastest rate the site tolerates.
+    """
+    def __init__(self, rate=1.0, min_rate=0.05, max_rate=5.0, burst=3, ramp_up_after=10, ramp_up_step=0.1,
+                 base_backoff=2.0, max_backoff=120.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.ramp_up_after = ramp_up_after
+        self.ramp_up_step = ramp_up_step
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.blocks_in_a_row = 0
+        self.successes_in_a_row = 0
+        self.total_blocks = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until the next navigation may start."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def is_paused(self):
+        """True while a pause from record_block is still running; acquire() waits it out."""
+        return time.monotonic() < self.paused_until
+
+    def backoff_delay(self, attempt):
+        """Exponential delay before retry `attempt` (0-based), with +/-50% jitter."""
+        delay = min(self.max_backoff, self.base_backoff * 2 ** attempt)
+        return delay * random.uniform(0.5, 1.5)
+
+    def record_success(self):
+        self.blocks_in_a_row = 0
+        self.successes_in_a_row += 1
+        if self.successes_in_a_row >= self.ramp_up_after and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.ramp_up_step)
+            self.successes_in_a_row = 0
+
+    def record_block(self, reason):
+        """Slow down after a blocked or throttled response. Returns the pause in seconds."""
+        self.successes_in_a_row = 0
+        self.total_blocks += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        delay = self.backoff_delay(self.blocks_in_a_row)
+        self.blocks_in_a_row += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        self.tokens = 0
+        log_message(f"🐢 {reason} - slowing to {self.rate * 60:.0f} pages/min and pausing {delay:.1f}s")
+        return delay
+
+    def summary(self):
+        return f"🐢 Ended at {self.rate * 60:.0f} pages/min after {self.total_blocks} blocked responses"
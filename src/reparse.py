@@ -0,0 +1,52 @@
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+from parser import parse_many_files
+from sinks import open_sink
+
+def collect_html_files(inputs):
+    """Expand files and directories into a sorted list of .html/.htm paths."""
+    paths = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in (".html", ".htm")))
+        else:
+            paths.append(path)
+    return paths
+
+def reparse_archive(inputs, output_csv=None, workers=None, chunk_size=16, backend=None, restricted=False):
+    return reparse_paths(collect_html_files(inputs), output_csv, workers, chunk_size, backend, restricted)
+
+def reparse_paths(paths, output_csv=None, workers=None, chunk_size=16, backend=None, restricted=False):
+    """Parse saved pages in order across worker processes and write their listings to one output file."""
+    if output_csv is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_csv = f"parsed_listings_{timestamp}.csv"
+
+    print(f"📂 Re-parsing {len(paths)} saved pages into {output_csv}")
+    start = time.perf_counter()
+
+    total = 0
+    with open_sink(output_csv) as sink:
+        for page_num, listings in enumerate(parse_many_files(paths, workers, chunk_size, backend, restricted), start=1):
+            sink.write(listings)
+            total += len(listings)
+            if page_num % 500 == 0:
+                print(f"✅ {page_num} pages, {total} listings so far")
+
+    elapsed = time.perf_counter() - start
+    print(f"🔚 Parsed {total} listings from {len(paths)} pages in {elapsed:.1f}s")
+    return output_csv
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Re-parse saved LoopNet result pages into a CSV using all CPU cores.")
+    arg_parser.add_argument("inputs", nargs="+", help="saved .html files or directories containing them")
+    arg_parser.add_argument("-o", "--output", help="output .csv, .db or .parquet (default: parsed_listings_<timestamp>.csv)")
+    arg_parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    arg_parser.add_argument("--chunk-size", type=int, default=16, help="pages sent to a worker at a time")
+    arg_parser.add_argument("--backend", choices=["selectolax", "lxml", "html.parser"], help="HTML engine (default: fastest installed)")
+    arg_parser.add_argument("--restricted", action="store_true", help="only build placard and pagination nodes (html.parser)")
+    args = arg_parser.parse_args()
+    reparse_archive(args.inputs, args.output, args.workers, args.chunk_size, args.backend, args.restricted)
@@ -0,0 +1,35 @@
+import argparse
+from page_cache import PageCache, DEFAULT_CACHE_DIR
+from reparse import reparse_paths
+
+def replay_run(run_id=None, output_csv=None, cache_dir=DEFAULT_CACHE_DIR, workers=None, backend=None):
+    """Re-run parsing and CSV export for a cached crawl, with no browser."""
+    cache = PageCache(cache_dir)
+    runs = cache.runs()
+    if not runs:
+        print(f"❌ No cached pages found in {cache_dir}")
+        return None
+    if run_id is not None and run_id not in runs:
+        print(f"❌ Run {run_id} is not in the cache. Cached runs: {', '.join(runs)}")
+        return None
+
+    run_id = run_id or runs[-1]
+    print(f"⏪ Replaying cached run {run_id}")
+    return reparse_paths(cache.run_paths(run_id), output_csv, workers, backend=backend)
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Replay a cached crawl through the parser without a browser.")
+    arg_parser.add_argument("--run", help="run id to replay (default: latest)")
+    arg_parser.add_argument("--list", action="store_true", help="list cached runs and exit")
+    arg_parser.add_argument("-o", "--output", help="output CSV (default: parsed_listings_<timestamp>.csv)")
+    arg_parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="page cache directory")
+    arg_parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    arg_parser.add_argument("--backend", choices=["selectolax", "lxml", "html.parser"], help="HTML engine (default: fastest installed)")
+    args = arg_parser.parse_args()
+
+    if args.list:
+        cache = PageCache(args.cache_dir)
+        for run in cache.runs():
+            print(f"{run}: {len(cache.run_pages(run))} pages")
+    else:
+        replay_run(args.run, args.output, args.cache_dir, args.workers, args.backend)
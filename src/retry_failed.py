@@ -0,0 +1,37 @@
+import argparse
+import asyncio
+from playwright.async_api import async_playwright
+from blocker import ResourceBlocker
+from fetcher import retry_failed_pages
+from gui import set_headless
+from main import find_installed_browser, install_playwright_browsers, launch_browser
+from page_cache import PageCache
+
+async def retry_output(output_csv, fetch_mode="render", cache_pages=True, headless=False):
+    """Open a browser and retry the failed pages of one crawl's output."""
+    browser_name, browser_executable = find_installed_browser()
+    if browser_executable is None:
+        install_playwright_browsers()
+
+    async with async_playwright() as p:
+        context, browser = await launch_browser(p, browser_name, browser_executable, headless=headless)
+        await ResourceBlocker().attach(context)
+        try:
+            return await retry_failed_pages(context, output_csv, fetch_mode=fetch_mode,
+                                            page_cache=PageCache() if cache_pages else None)
+        finally:
+            await context.close()
+            if browser:
+                await browser.close()
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Refetch the pages a crawl failed on and add them to its output.")
+    arg_parser.add_argument("output", help="output file of the crawl (its .failed.json list is read)")
+    arg_parser.add_argument("--fetch-mode", choices=["render", "request"], default="render", help="how pages are loaded")
+    arg_parser.add_argument("--no-cache", action="store_true", help="don't save refetched pages to the page cache")
+    arg_parser.add_argument("--show-browser", action="store_true", help="run the browser with a window")
+    args = arg_parser.parse_args()
+
+    set_headless()
+    added = asyncio.run(retry_output(args.output, args.fetch_mode, not args.no_cache, headless=not args.show_browser))
+    print(f"✅ Added {added} listings to {args.output}")
@@ -0,0 +1,51 @@
+import json
+import os
+import time
+from pathlib import Path
+
+DEFAULT_SEARCH_CACHE_PATH = Path(__file__).parent / "search_cache.json"
+DEFAULT_TTL = 7 * 24 * 3600
+
+class SearchCache:
+    """Small JSON cache of search-form metadata scraped from the site, with a TTL.
+
+    Holds property-type labels per sale type, typeahead suggestions per sale
+    type and keyword, price pill labels, and the results URL each location
+    choice led to, so repeat searches can skip those page interactions.
+    """
+    def __init__(self, path=DEFAULT_SEARCH_CACHE_PATH, ttl=DEFAULT_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.data = {}
+        if self.path.exists():
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable search cache {self.path}: {e}")
+
+    @staticmethod
+    def key(*parts):
+        return "|".join(str(part).strip().casefold() for part in parts)
+
+    def get(self, kind, key):
+        """Cached value, or None if missing or older than the TTL."""
+        entry = self.data.get(kind, {}).get(key)
+        if entry is None or time.time() - entry["saved_at"] > self.ttl:
+            return None
+        return entry["value"]
+
+    def put(self, kind, key, value):
+        self.data.setdefault(kind, {})[key] = {"value": value, "saved_at": time.time()}
+        self.save()
+
+    def save(self):
+        # Drop expired entries so the file doesn't grow forever
+        now = time.time()
+        for entries in self.data.values():
+            for key in [key for key, entry in entries.items() if now - entry["saved_at"] > self.ttl]:
+                del entries[key]
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
@@ -1,13 +1,69 @@
+import re
 import time
 import random
+import unicodedata
+from functools import partial
+from urllib.parse import unquote_plus, urlsplit, urlunsplit, parse_qsl, urlencode
 from gui import show_sale_type_dialog, show_property_type_dialog, show_location_input_dialog, show_location_options_dialog, show_price_range_dialog, show_space_input_dialog, show_loading_message, log_message, show_failure_screen, close_gui
 import asyncio
 from playwright.async_api import TimeoutError
+from rate_limiter import RateLimiter, is_block_response
+from search_cache import SearchCache
+
+class Pacing:
+    """How the search steps wait between actions.
+
+    "fast" waits only for what the next action needs (an element becoming
+    visible, the URL changing) and types without a keystroke delay. "human"
+    keeps the randomized pauses and slow typing as an anti-detection profile.
+    Both keep track of the fixed delay involved so runs can be compared.
+    """
+    PROFILES = ("fast", "human")
+
+    def __init__(self, profile="fast"):
+        if profile not in self.PROFILES:
+            raise ValueError(f"Unknown pacing profile {profile!r}, expected one of {', '.join(self.PROFILES)}")
+        self.profile = profile
+        self.human = profile == "human"
+        self.paused = 0.0  # Seconds slept in human mode
+        self.skipped = 0.0  # Average seconds the human profile would have slept, in fast mode
+
+    async def pause(self, low=0.5, high=1.0, ready=None):
+        """Randomized pause in human mode; in fast mode await `ready` instead, if given.
+
+        `ready` is an async function returning whether the page got to the state
+        the next action needs, e.g. partial(_became_visible, locator).
+        """
+        if self.human:
+            delay = random.uniform(low, high)
+            self.paused += delay
+            await asyncio.sleep(delay)
+            return
+        self.skipped += (low + high) / 2
+        if ready is not None and not await ready():
+            log_message("⚠️ Page did not settle in time, carrying on")
+
+    def typing_delay(self, text):
+        """Milliseconds between keystrokes when typing `text`."""
+        if self.human:
+            self.paused += len(text) * 0.1
+            return 100
+        self.skipped += len(text) * 0.1
+        return 0
+
+    def summary(self):
+        if self.human:
+            return f"{self.paused:.1f}s of it in randomized pauses"
+        return f"about {self.skipped:.1f}s of fixed delays skipped (fast pacing)"
 
 class NavigationState:
-    def __init__(self):
+    def __init__(self, preset=None, search_cache=None, pacing=None, rate_limiter=None):
         self.step_stack = []
         self.data = {}
+        self.preset = preset
+        self.search_cache = search_cache
+        self.pacing = pacing or Pacing()
+        self.rate_limiter = rate_limiter or RateLimiter()
         
     def push_step(self, step_name, data=None):
         self.step_stack.append(step_name)
@@ -43,9 +99,207 @@ class NavigationState:
     def get_previous_step(self):
         return self.step_stack[-2] if len(self.step_stack) > 1 else None
 
-async def select_autocomplete_option(context):
+SEARCH_BASE_URL = "https://www.loopnet.ca/search"
+
+# Results-URL path segment for each property type, per sale type
+PROPERTY_TYPE_SLUGS = {
+    "lease": {
+        "office": "office-space",
+        "industrial": "industrial-space",
+        "retail": "retail-space",
+        "restaurant": "restaurants",
+        "flex": "flex-space",
+        "medical": "medical-office-space",
+        "coworking": "coworking-space",
+        "land": "land",
+        "all": "commercial-real-estate",
+    },
+    "sale": {
+        "office": "office-buildings",
+        "industrial": "industrial-properties",
+        "retail": "retail-properties",
+        "restaurant": "restaurants",
+        "flex": "flex-properties",
+        "medical": "medical-office-buildings",
+        "multifamily": "apartment-buildings",
+        "hospitality": "hospitality-properties",
+        "land": "land",
+        "all": "commercial-real-estate",
+    },
+}
+
+def slugify(text):
+    # "Montréal, QC" -> "montreal-qc"
+    ascii_text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", ascii_text.lower()).strip("-")
+
+def build_search_url(sale_type, property_type, location):
+    """Results URL for a search without price or space filters, or None if the property type is unknown.
+
+    e.g. ("lease", "Office", "Toronto, ON") -> .../search/office-space/toronto-on/for-lease/
+    """
+    sale_key = "sale" if str(sale_type).strip().lower() in ("sale", "for sale") else "lease"
+    property_key = (property_type or "all").strip().lower().split()[0]
+    property_slug = PROPERTY_TYPE_SLUGS[sale_key].get(property_key)
+    if property_slug is None or not location:
+        return None
+    return f"{SEARCH_BASE_URL}/{property_slug}/{slugify(location)}/for-{sale_key}/"
+
+def _match_option(options, wanted, default_first=False):
+    """Index of the option whose text best matches `wanted`: exact, then prefix, then substring."""
+    wanted = (wanted or "").strip().casefold()
+    texts = {i: option["text"].strip().casefold() for i, option in options.items()}
+    if wanted:
+        for matches in (lambda text: text == wanted, lambda text: text.startswith(wanted), lambda text: wanted in text):
+            for i, text in texts.items():
+                if matches(text):
+                    return i
+    if default_first and options:
+        return min(options)
+    log_message(f"❌ No option matches '{wanted}'. Available: {', '.join(option['text'] for option in options.values())}")
+    return None
+
+class SearchPreset:
+    """Answers the search steps from a search definition instead of the GUI dialogs.
+
+    A definition is a dict with "sale_type" ("lease" or "sale"), "property_type"
+    (a tile label such as "Office"), "location" (typed into the search box; the
+    best-matching suggestion is picked) and optional "price" ({"type": price pill
+    label, "min": ..., "max": ...}) and "space" ({"min": ..., "max": ...}) filters.
+    """
+    def __init__(self, definition):
+        self.definition = definition
+
+    def answer(self, step, options=None):
+        definition = self.definition
+        if step == 'sale_type':
+            return 1 if str(definition.get("sale_type", "lease")).strip().lower() in ("sale", "for sale") else 0
+        if step == 'property_type':
+            return _match_option(options, definition.get("property_type"))
+        if step == 'location_input':
+            return definition.get("location")
+        if step == 'location_options':
+            return _match_option(options, definition.get("location"), default_first=True)
+        if step == 'price_range':
+            price = definition.get("price")
+            if not price:
+                return "skip"
+            price_type = _match_option(options, price.get("type"))
+            if price_type is None:
+                return None
+            return {"price_type": price_type, "min_value": str(price.get("min") or ""), "max_value": str(price.get("max") or "")}
+        if step == 'space_input':
+            space = definition.get("space")
+            if not space:
+                return "skip"
+            return {"min": str(space.get("min") or ""), "max": str(space.get("max") or "")}
+        return None
+
+def _sale_key(nav_state):
+    return "sale" if nav_state.data.get('sale_type_choice') == 1 else "lease"
+
+def _selected_property(nav_state):
+    prop_options = nav_state.data.get('prop_options', {})
+    return prop_options.get(nav_state.data.get('selected_prop'), {}).get("text", "")
+
+def _exact_text(label):
+    return re.compile(rf"^\s*{re.escape(label)}\s*$")
+
+def _cached(nav_state, kind, key):
+    return nav_state.search_cache.get(kind, key) if nav_state.search_cache else None
+
+def _cache(nav_state, kind, key, value):
+    if nav_state.search_cache and value:
+        nav_state.search_cache.put(kind, key, value)
+
+# Query parameters tied to the browsing session, which go stale long before a cached URL does
+SESSION_PARAMS = ("sk",)
+
+def _without_session_params(url):
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True) if name not in SESSION_PARAMS]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+async def _option_texts(items, text_selector=None):
+    """Text of every element `items` matches, read in a single round trip.
+
+    The text comes from the first `text_selector` match inside each element,
+    falling back to the element's own text. Position i in the result is
+    `items.nth(i)`, so callers click through that locator rather than a handle.
+    """
+    return await items.evaluate_all(
+        """(elements, selector) => elements.map(element => {
+            const target = selector ? element.querySelector(selector) : null;
+            return ((target && target.innerText.trim()) || element.innerText || "").trim();
+        })""",
+        text_selector,
+    )
+
+def _ask(nav_state, step, dialog, *args):
+    """Answer a step from the preset search when there is one, otherwise through its GUI dialog."""
+    if nav_state.preset is not None:
+        return nav_state.preset.answer(step, *args)
+    return dialog(*args)
+
+async def _has_results(context, url, rate_limiter):
+    await rate_limiter.acquire()
+    try:
+        response = await context.request.get(url, timeout=30000, headers={"Accept": "text/html"})
+        html = await response.text()
+    except Exception as e:
+        log_message(f"⚠️ Could not check {url}: {e}")
+        return False
+    if is_block_response(response.status, html):
+        rate_limiter.record_block(f"Blocked (HTTP {response.status})")
+        return False
+    return response.status == 200 and "placard" in html.lower()
+
+async def resolve_search_url(context, definition, rate_limiter=None, search_cache=None, pacing=None):
+    """Results URL for a search definition (see SearchPreset), taking the fastest route available.
+
+    Uses definition["url"] when there is one. Without price or space filters the
+    URL is built from the fields and checked with a single request. Otherwise, or
+    if the built URL shows no results, the search steps run in a browser tab.
+    """
+    if definition.get("url"):
+        return definition["url"]
+    rate_limiter = rate_limiter or RateLimiter()
+    if not definition.get("price") and not definition.get("space"):
+        url = build_search_url(definition.get("sale_type", "lease"), definition.get("property_type"), definition.get("location"))
+        if url and await _has_results(context, url, rate_limiter):
+            log_message(f"⚡ Built results URL directly: {url}")
+            return url
+        log_message("ℹ️ Could not build the results URL directly, running the search steps instead")
+    return await select_autocomplete_option(context, rate_limiter, preset=SearchPreset(definition), search_cache=search_cache,
+                                            pacing=pacing)
+
+async def select_autocomplete_option(context, rate_limiter=None, preset=None, search_cache=None, pacing=None):
+    """Walk the search steps and return the results URL, or None if cancelled or blocked.
+
+    Each step is answered through the GUI dialogs, or from `preset` (a
+    SearchPreset) when one is given. Property types, location suggestions,
+    price pills and location results URLs come from `search_cache` (a
+    SearchCache, by default the one in src/) when it has them. `pacing` (a
+    Pacing) sets how the steps wait between actions, fast by default.
+    """
+    started = time.perf_counter()
+    pacing = pacing or Pacing()
+    rate_limiter = rate_limiter or RateLimiter()
+    nav_state = NavigationState(preset, search_cache or SearchCache(), pacing, rate_limiter)
     page = await context.new_page()
-    nav_state = NavigationState()
+    try:
+        final_url = await _walk_search_steps(page, nav_state)
+    finally:
+        # Closed however the steps end, so a cancelled search doesn't leave its tab open
+        await page.close()
+    if final_url:
+        log_message("🔄 Search setup complete, ready for data collection")
+        log_message(f"⏱️ Search steps took {time.perf_counter() - started:.1f}s, {pacing.summary()}")
+    return final_url
+
+async def _walk_search_steps(page, nav_state):
+    """Open the homepage on `page` and run the search steps; the results URL, or None if cancelled or blocked."""
+    preset, pacing, rate_limiter = nav_state.preset, nav_state.pacing, nav_state.rate_limiter
     max_retries = 3
 
     for attempt in range(max_retries):
@@ -53,32 +307,38 @@ async def select_autocomplete_option(context):
             show_loading_message(f"Connecting to LoopNet.ca (Attempt {attempt + 1}/{max_retries})...")
             log_message(f"🔄 Attempt {attempt + 1} to access LoopNet.ca")
 
-            await page.goto("https://www.loopnet.ca/", wait_until="domcontentloaded", timeout=30000)
+            await rate_limiter.acquire()
+            response = await page.goto("https://www.loopnet.ca/", wait_until="domcontentloaded", timeout=30000)
             page_content = await page.content()
+            status = response.status if response else None
 
-            if "access denied" in page_content.lower() or "blocked" in page_content.lower() or "403" in page_content:
+            if is_block_response(status, page_content):
                 log_message(f"⚠️ Access denied detected on attempt {attempt + 1}")
+                rate_limiter.record_block(f"Homepage blocked (HTTP {status})")
                 if attempt < max_retries - 1:
                     log_message("🔄 Refreshing page and retrying...")
-                    await asyncio.sleep(random.uniform(2, 4))
+                    await asyncio.sleep(rate_limiter.backoff_delay(attempt))
                     continue
                 else:
                     log_message("❌ Access denied after all retry attempts")
-                    show_failure_screen()
+                    if preset is None:
+                        show_failure_screen()
                     return None
 
+            rate_limiter.record_success()
             log_message("✅ Successfully connected to LoopNet.ca")
-            await asyncio.sleep(random.uniform(0.5, 1))
+            await pacing.pause()
             break
 
         except Exception as e:
             log_message(f"⚠️ Connection attempt {attempt + 1} failed: {str(e)}")
             if attempt < max_retries - 1:
                 log_message("🔄 Retrying in a few seconds...")
-                await asyncio.sleep(random.uniform(3, 6))
+                await asyncio.sleep(rate_limiter.backoff_delay(attempt))
             else:
                 log_message("❌ Failed to connect after all attempts")
-                show_failure_screen()
+                if preset is None:
+                    show_failure_screen()
                 return None
 
     
@@ -152,10 +412,7 @@ async def select_autocomplete_option(context):
     log_message(f"🌐 Redirected to: {final_url}")
     
     show_loading_message("Setup complete! Preparing search results...")
-    await asyncio.sleep(2)
-    
-    await page.close()
-    log_message("🔄 Search setup complete, ready for data collection")
+    await pacing.pause(2, 2)
     
     return final_url
 
@@ -171,7 +428,7 @@ async def handle_sale_type_step(page, nav_state):
         log_message("⚠️ Page elements may not be fully loaded")
     
     nav_state.push_step('sale_type')
-    result = show_sale_type_dialog(sale_type_options)
+    result = _ask(nav_state, 'sale_type', show_sale_type_dialog, sale_type_options)
     if result is None:
         return 'cancelled'
     elif isinstance(result, dict) and result.get('action') == 'back':
@@ -179,41 +436,75 @@ async def handle_sale_type_step(page, nav_state):
     
     locator = page.locator(sale_type_options[result]["selector"])
     await locator.wait_for(state="visible", timeout=5000)
+    tiles = page.locator(PROPERTY_TILE_SELECTOR)
+    labels_before = await _option_texts(tiles, "p.bold")
     await locator.click()
     log_message(f"✅ Selected: {sale_type_options[result]['label']}")
     
     nav_state.data['sale_type_choice'] = result
-    await asyncio.sleep(random.uniform(0.5, 1))  # Use asyncio.sleep here
+    # The property tiles of the other sale type may still be showing, so wait for the switch
+    ready = None
+    if not _shows_sale_type_tiles(labels_before, _sale_key(nav_state)):
+        ready = partial(_sale_type_switched, page, locator, labels_before)
+    await nav_state.pacing.pause(ready=ready)
     
     return 'continue'
 
+PROPERTY_TILE_SELECTOR = "div.property-type-icons div.property-type"
+
+def _shows_sale_type_tiles(labels, sale_key):
+    """Whether the tile labels include a property type only `sale_key` ("lease"/"sale") offers."""
+    other_key = "lease" if sale_key == "sale" else "sale"
+    only_here = set(PROPERTY_TYPE_SLUGS[sale_key]) - set(PROPERTY_TYPE_SLUGS[other_key])
+    return any(label.split()[0].lower() in only_here for label in labels if label.strip())
+
+async def _sale_type_switched(page, option, labels_before, timeout=5000):
+    """Wait until the clicked sale type `option` looks active or the property tiles changed."""
+    try:
+        handle = await option.element_handle(timeout=timeout)
+        await page.wait_for_function(
+            r"""([option, tileSelector, before]) => {
+                if (/\b(active|selected)\b/.test(option.className)) return true;
+                const labels = [...document.querySelectorAll(tileSelector)].map(tile =>
+                    ((tile.querySelector("p.bold") || tile).innerText || "").trim());
+                return labels.length > 0 && labels.join("|") !== before.join("|");
+            }""",
+            arg=[handle, PROPERTY_TILE_SELECTOR, labels_before],
+            timeout=timeout,
+        )
+        return True
+    except TimeoutError:
+        return False
+
 async def handle_property_type_step(page, nav_state):
     try:
-        await page.wait_for_selector("div.property-type-icons div.property-type", timeout=10000)
+        await page.wait_for_selector(PROPERTY_TILE_SELECTOR, timeout=10000)
         log_message("✅ Selector found, continuing...")
     except Exception as e:
         log_message(f"❌ Failed to find property type selector: {e}")
         return 'cancelled'
-    prop_types_section = page.locator("div.property-type-icons")
-    prop_type_tiles = prop_types_section.locator("div.property-type")
+    prop_type_tiles = page.locator(PROPERTY_TILE_SELECTOR)
     
-    prop_count = await prop_type_tiles.count()
+    cache_key = SearchCache.key(_sale_key(nav_state))
+    cached_labels = _cached(nav_state, "property_types", cache_key)
     prop_options = {}
     
-    for i in range(prop_count):
-        tile = prop_type_tiles.nth(i)
-        try:
-            label = (await tile.locator("p.bold").inner_text()).strip()
-            if not label:
-                label = (await tile.inner_text()).strip()
+    if cached_labels:
+        for i, label in enumerate(cached_labels):
+            tile = prop_type_tiles.filter(has=page.locator("p.bold", has_text=_exact_text(label))).first
             prop_options[i] = {"text": label, "element": tile}
-        except Exception as e:
-            log_message(f"⚠️ Error reading property type {i}: {e}")
-    
-    log_message("🏢 Property Types retrieved")
+        log_message("🏢 Property Types loaded from cache")
+    else:
+        labels = await _option_texts(prop_type_tiles, "p.bold")
+        for i, label in enumerate(labels):
+            if label:
+                prop_options[i] = {"text": label, "element": prop_type_tiles.nth(i)}
+        
+        log_message("🏢 Property Types retrieved")
+        _cache(nav_state, "property_types", cache_key, [option["text"] for option in prop_options.values()])
     
     nav_state.push_step('property_type')
-    result = show_property_type_dialog(prop_options)
+    result = _ask(nav_state, 'property_type', show_property_type_dialog, prop_options)
     
     if result is None:
         return 'cancelled'
@@ -227,12 +518,12 @@ async def handle_property_type_step(page, nav_state):
     
     nav_state.data['selected_prop'] = result
     nav_state.data['prop_options'] = prop_options
-    await asyncio.sleep(random.uniform(0.5, 1))
+    await nav_state.pacing.pause()
     return 'continue'
 
 async def handle_location_input_step(page, nav_state):
     nav_state.push_step('location_input')
-    result = show_location_input_dialog()
+    result = _ask(nav_state, 'location_input', show_location_input_dialog)
     
     if result is None:
         return 'cancelled'
@@ -244,47 +535,160 @@ async def handle_location_input_step(page, nav_state):
     log_message(f"🔎Using location keyword: {result}")
     return 'continue'
 
-async def handle_location_options_step(page, nav_state):
-    keyword = nav_state.data['keyword']
-    
-    show_loading_message("Waiting for location suggestions...")
-    
+# Substrings that mark the location box's suggestion requests
+TYPEAHEAD_URL_MARKERS = ("typeahead", "autocomplete", "autosuggest", "suggest", "lookup")
+TYPEAHEAD_POPUP_SELECTOR = "ul.typeahead-popup"
+SUGGESTION_SELECTOR = "li[role='option']"
+# Where the typeahead JSON keeps its suggestions and each one's label (keys matched case-insensitively)
+SUGGESTION_LIST_KEY = "Suggestions"
+SUGGESTION_TEXT_KEY = "Display"
+
+def _is_typeahead_response(response, keyword):
+    """Whether `response` is the JSON suggestion request for the full `keyword`."""
+    request = response.request
+    if request.resource_type not in ("xhr", "fetch"):
+        return False
+    url = unquote_plus(response.url).casefold()
+    if not any(marker in url for marker in TYPEAHEAD_URL_MARKERS):
+        return False
+    # Typing fires a request per keystroke; only the one for the whole keyword is wanted
+    sent = url + unquote_plus(request.post_data or "").casefold()
+    return keyword.strip().casefold() in sent
+
+def _suggestion_texts(data):
+    """Labels of the suggestions in a typeahead JSON payload, or None if it isn't in the expected shape.
+
+    Only a top-level list, or the list under SUGGESTION_LIST_KEY, is read, and
+    every item must be a string or carry its label under SUGGESTION_TEXT_KEY.
+    Anything else returns None so the suggestions are read from the popup.
+    """
+    if isinstance(data, dict):
+        keys = {key.casefold(): key for key in data}
+        data = data.get(keys.get(SUGGESTION_LIST_KEY.casefold()))
+    if not isinstance(data, list):
+        return None
+    texts = []
+    for item in data:
+        if isinstance(item, dict):
+            keys = {key.casefold(): key for key in item}
+            item = item.get(keys.get(SUGGESTION_TEXT_KEY.casefold()))
+        if not isinstance(item, str):
+            return None
+        # Labels can carry highlighting markup around the matched part
+        text = re.sub(r"<[^>]+>", "", item).strip()
+        if text:
+            texts.append(text)
+    return texts
+
+async def _became_visible(locator, timeout=10000):
+    try:
+        await locator.wait_for(state="visible", timeout=timeout)
+        return True
+    except TimeoutError:
+        return False
+
+async def _type_location_keyword(page, keyword, pacing):
+    """Type `keyword` into the location box and read the typeahead suggestions, or None if none appear.
+
+    The suggestions are read from the JSON response of the typeahead request,
+    so they don't wait on the popup rendering. The popup's list items are read
+    instead when no such response comes or it can't be parsed.
+    """
     # Clear the input field first and then type the new keyword
     location_input = page.locator("input[name='geography']:visible")
     await location_input.click()
     await location_input.fill('')  # Clear existing content
-    await asyncio.sleep(0.5)  # Small delay to ensure clearing
-    await location_input.type(keyword, delay=100)
+    await pacing.pause(0.5, 0.5)
+    
+    popup = page.locator(TYPEAHEAD_POPUP_SELECTOR)
+    li_elements = popup.locator(SUGGESTION_SELECTOR)
+    typeahead_response = asyncio.get_running_loop().create_future()
+    
+    def on_response(response):
+        if not typeahead_response.done() and _is_typeahead_response(response, keyword):
+            typeahead_response.set_result(response)
     
-    popup = page.locator("ul.typeahead-popup")
+    page.on("response", on_response)
     try:
-        await popup.wait_for(state="visible", timeout=10000)
-    except:
+        await location_input.type(keyword, delay=pacing.typing_delay(keyword))
+        # The response normally lands before the popup renders; whichever comes first wins
+        popup_visible = asyncio.ensure_future(_became_visible(popup))
+        await asyncio.wait([typeahead_response, popup_visible], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        page.remove_listener("response", on_response)
+    
+    if typeahead_response.done():
+        popup_visible.cancel()
+        try:
+            texts = _suggestion_texts(await typeahead_response.result().json())
+        except Exception as e:
+            log_message(f"⚠️ Could not read the typeahead response: {e}")
+            texts = []
+        if texts:
+            log_message(f"⚡ Read {len(texts)} location suggestions from the typeahead response")
+            # The popup may order, group or cap its items differently, so each is clicked by its label
+            return {i: {"text": text, "element": li_elements.filter(has_text=_exact_text(text)).first}
+                    for i, text in enumerate(texts)}
+        log_message("ℹ️ No readable suggestions in the typeahead response, reading the popup instead")
+        popup_visible = asyncio.ensure_future(_became_visible(popup))
+    
+    if not await popup_visible:
         log_message("❌ Autocomplete popup did not appear.")
-        return 'cancelled'
+        return None
     
-    options = {}
-    li_elements = popup.locator("li[role='option']")
-    count = await li_elements.count()
-    print(count)
-    for i in range(count):
-        li = li_elements.nth(i)
-        a = li.locator("a")
-        try:
-            raw_html = await li.inner_html()
-            print(f"🔹 [li #{i}] Raw HTML: {raw_html}")
+    texts = await _option_texts(li_elements, "a")
+    return {i: {"text": text, "element": li_elements.nth(i)} for i, text in enumerate(texts) if text}
 
-            text = (await a.inner_text()).strip()  # await here!
-            print(f"🔹 [li #{i}] Inner Text: {text}")
+def _normalized(text):
+    return " ".join(text.split()).casefold()
 
-            options[i] = {"text": text, "element": li}
-        except Exception as e:
-            log_message(f"⚠️ Error reading item {i}: {e}")
+async def _shown_suggestion(page, options, index):
+    """Locator of the popup item for options[index], or None if the popup doesn't show it.
+
+    Suggestions read from the typeahead response are bound to the item with the
+    same label. When the rendered text differs (markup, whitespace) the label is
+    looked up in the popup's own text instead. Failing that, the item at the
+    same position is used, but only if the popup lists as many items as the
+    response and shows none of its labels, i.e. every label is rendered
+    differently rather than this one being missing.
+    """
+    popup = page.locator(TYPEAHEAD_POPUP_SELECTOR)
+    if not await _became_visible(popup):
+        return None
+    element = options[index]["element"]
+    if await element.count():
+        return element
+    li_elements = popup.locator(SUGGESTION_SELECTOR)
+    shown = [_normalized(text) for text in await _option_texts(li_elements, "a")]
+    wanted = _normalized(options[index]["text"])
+    if wanted in shown:
+        return li_elements.nth(shown.index(wanted))
+    if len(shown) == len(options) and not {_normalized(option["text"]) for option in options.values()} & set(shown):
+        log_message(f"⚠️ '{options[index]['text']}' is shown differently in the popup, picking it by position")
+        return li_elements.nth(index)
+    return None
+
+async def handle_location_options_step(page, nav_state):
+    keyword = nav_state.data['keyword']
+    sale_key = _sale_key(nav_state)
+    
+    show_loading_message("Waiting for location suggestions...")
     
-    log_message("📍 Location Suggestions retrieved")
+    # Suggestions seen before for this keyword are offered straight away
+    cache_key = SearchCache.key(sale_key, keyword)
+    cached_suggestions = _cached(nav_state, "locations", cache_key)
+    if cached_suggestions:
+        options = {i: {"text": text, "element": None} for i, text in enumerate(cached_suggestions)}
+        log_message("📍 Location Suggestions loaded from cache")
+    else:
+        options = await _type_location_keyword(page, keyword, nav_state.pacing)
+        if options is None:
+            return 'cancelled'
+        log_message("📍 Location Suggestions retrieved")
+        _cache(nav_state, "locations", cache_key, [option["text"] for option in options.values()])
     
     nav_state.push_step('location_options')
-    result = show_location_options_dialog(options)
+    result = _ask(nav_state, 'location_options', show_location_options_dialog, options)
     
     if result is None:
         return 'cancelled'
@@ -293,21 +697,53 @@ async def handle_location_options_step(page, nav_state):
         return 'back'
     
     # Execute the selection
+    chosen = options[result]["text"]
+    url_key = SearchCache.key(sale_key, _selected_property(nav_state), chosen)
+    cached_url = _cached(nav_state, "location_urls", url_key)
+    if cached_url:
+        # Entries saved before session params were stripped may still carry one
+        cached_url = _without_session_params(cached_url)
     previous_url = page.url
-    await options[result]["element"].click()
-    log_message(f"✅ Selected: {options[result]['text']}")
-    show_loading_message("Fetching price range filter options...")
-    
-    # Wait for URL to change
-    try:
-        await page.wait_for_url(lambda url: url != previous_url, timeout=10000)
-    except Exception:
-        log_message("⚠️ URL did not change after location selection, waiting for load event instead.")
-        await page.wait_for_load_state("load")
+    if cached_url:
+        # This location was picked before, so go straight to the results it led to
+        await nav_state.rate_limiter.acquire()
+        response = await page.goto(cached_url, wait_until="domcontentloaded", timeout=30000)
+        status = response.status if response else None
+        if is_block_response(status, await page.content()):
+            nav_state.rate_limiter.record_block(f"Cached results URL blocked (HTTP {status})")
+            log_message(f"❌ Access denied opening the results for {chosen}")
+            return 'cancelled'
+        nav_state.rate_limiter.record_success()
+        log_message(f"✅ Selected: {chosen} (cached results URL)")
+        show_loading_message("Fetching price range filter options...")
+    else:
+        shown_options, index = options, result
+        if options[result]["element"] is None:
+            # The suggestions came from the cache, so open the typeahead to click the real one
+            shown_options = await _type_location_keyword(page, keyword, nav_state.pacing)
+            index = _match_option(shown_options, chosen) if shown_options else None
+            if index is None:
+                return 'cancelled'
+        element = await _shown_suggestion(page, shown_options, index)
+        if element is None:
+            log_message(f"❌ '{chosen}' is not in the location suggestions shown on the page")
+            return 'cancelled'
+        await element.click()
+        log_message(f"✅ Selected: {chosen}")
+        show_loading_message("Fetching price range filter options...")
+        
+        # Wait for URL to change
+        try:
+            await page.wait_for_url(lambda url: url != previous_url, timeout=10000)
+        except Exception:
+            log_message("⚠️ URL did not change after location selection, waiting for load event instead.")
+            await page.wait_for_load_state("load")
+        if page.url != previous_url:
+            _cache(nav_state, "location_urls", url_key, _without_session_params(page.url))
     
     nav_state.data['selected_location'] = result
     nav_state.data['location_options'] = options
-    await asyncio.sleep(random.uniform(0.5, 1))
+    await nav_state.pacing.pause()
     return 'continue'
 
 async def handle_price_range_step(page, nav_state):
@@ -335,22 +771,25 @@ async def handle_price_range_step(page, nav_state):
         await price_form.wait_for(state="visible", timeout=10000)
         
         pills = price_form.locator('div.pill:not(.ng-hide)')
-        pill_count = await pills.count()
-        
-        log_message(f"🪙 Found {pill_count} price range options")
         pill_options = {}
+        cache_key = SearchCache.key(_sale_key(nav_state), _selected_property(nav_state))
+        cached_labels = _cached(nav_state, "price_pills", cache_key)
         
-        for i in range(pill_count):
-            pill = pills.nth(i)
-            try:
-                label_element = pill.locator('label')
-                label_text = (await label_element.inner_text()).strip()
-                pill_options[i] = {"text": label_text, "element": label_element}
-            except Exception as e:
-                log_message(f"⚠️ Error reading pill {i}: {e}")
+        if cached_labels:
+            for i, label_text in enumerate(cached_labels):
+                pill_options[i] = {"text": label_text, "element": pills.locator('label', has_text=_exact_text(label_text)).first}
+            log_message(f"🪙 Loaded {len(pill_options)} price range options from cache")
+        else:
+            labels = await _option_texts(pills, 'label')
+            log_message(f"🪙 Found {len(labels)} price range options")
+            
+            for i, label_text in enumerate(labels):
+                if label_text:
+                    pill_options[i] = {"text": label_text, "element": pills.nth(i).locator('label')}
+            _cache(nav_state, "price_pills", cache_key, [option["text"] for option in pill_options.values()])
         
         nav_state.push_step('price_range')
-        result = show_price_range_dialog(pill_options)
+        result = _ask(nav_state, 'price_range', show_price_range_dialog, pill_options)
         
         if result is None:
             return 'cancelled'
@@ -373,8 +812,9 @@ async def handle_price_range_step(page, nav_state):
             await pill_options[price_type_idx]["element"].click()
             log_message(f"✅ Clicked price range type: {pill_options[price_type_idx]['text']}")
             
-            # Small delay to let the form update
-            await asyncio.sleep(random.uniform(0.5, 1))
+            # Let the form update before looking for the price inputs
+            price_inputs = price_form.locator('input[type="text"]').first
+            await nav_state.pacing.pause(ready=partial(_became_visible, price_inputs) if min_value or max_value else None)
             
             # Step 2: Enter min/max values if provided
             if min_value or max_value:
@@ -411,7 +851,7 @@ async def handle_price_range_step(page, nav_state):
                             log_message("⚠️ URL did not change after filter, waiting for load event instead.")
                             await page.wait_for_load_state("load")
                         
-                        await asyncio.sleep(random.uniform(0.5, 1))
+                        await nav_state.pacing.pause()
                         
                     else:
                         log_message(f"⚠️ Expected 2 text inputs, found {input_count}")
@@ -458,7 +898,7 @@ async def handle_space_input_step(page, nav_state):
         await space_dropdown.click()
         
         nav_state.push_step('space_input')
-        result = show_space_input_dialog()
+        result = _ask(nav_state, 'space_input', show_space_input_dialog)
         
         if result is None:
             return 'cancelled'
@@ -475,7 +915,7 @@ async def handle_space_input_step(page, nav_state):
         
         space_form = page.locator(f'form[name="{space_form_name}"]')
         try:
-            space_form.wait_for(state="attached", timeout=5000)
+            await space_form.wait_for(state="attached", timeout=5000)
             
             sf_inputs = space_form.locator('input[type="text"][placeholder*="SF"]')
             sf_count = await sf_inputs.count()
@@ -499,7 +939,7 @@ async def handle_space_input_step(page, nav_state):
                     log_message("⚠️ URL did not change after space filter selection, waiting for load event instead.")
                     await page.wait_for_load_state("load")
                 
-                await asyncio.sleep(random.uniform(0.5, 1))
+                await nav_state.pacing.pause()
                 
         except Exception as e:
             log_message(f"⚠️ Error with space form: {e}")
@@ -0,0 +1,525 @@
+import csv
+import gzip
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from parser import LISTING_FIELDS, parse_number_range
+
+# Optional - only needed for Parquet output
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Optional - only needed for .zst output
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Optional - faster JSON Lines serialization, the json module is used without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def open_text_output(path, append=False):
+    """Open a text file for writing, compressing on the fly for .gz and .zst paths.
+
+    Appending to a compressed file adds a new gzip member / zstd frame, which
+    readers decode as one continuous stream.
+    """
+    mode = "at" if append else "wt"
+    lowered = str(path).lower()
+    if lowered.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8", newline="")
+    if lowered.endswith(".zst"):
+        if zstandard is None:
+            raise ValueError("zstd output needs the zstandard package, which is not installed")
+        return zstandard.open(path, mode, encoding="utf-8", newline="")
+    return open(path, mode[0], newline="", encoding="utf-8")
+
+def open_text_input(path):
+    """Open a (possibly .gz/.zst compressed) text file for one streaming read."""
+    lowered = str(path).lower()
+    if lowered.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    if lowered.endswith(".zst"):
+        if zstandard is None:
+            raise ValueError("zstd input needs the zstandard package, which is not installed")
+        return zstandard.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, newline="", encoding="utf-8")
+
+def read_listings(path):
+    """Yield listing dicts from a CSV or JSON Lines output file (plain, .gz or .zst) in one pass."""
+    with open_text_input(path) as f:
+        if _base_suffix(path) in JSONL_SUFFIXES:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+def _base_suffix(path):
+    """Extension of `path` ignoring a trailing .gz/.zst, e.g. ".csv" for "out.csv.gz"."""
+    lowered = str(path).lower()
+    for compressed in (".gz", ".zst"):
+        if lowered.endswith(compressed):
+            lowered = lowered[:-len(compressed)]
+    return os.path.splitext(lowered)[1]
+
+class ListingSink:
+    """Long-lived listing writer that does its I/O on a background thread.
+
+    write() only hands rows to the writer thread, which buffers them and
+    writes a batch once `batch_size` rows are waiting or `flush_interval`
+    seconds have passed. checkpoint() makes everything written so far durable
+    (flush + fsync) and then runs a callback on the writer thread, so callers
+    never block on disk. Subclasses implement the storage format through
+    _open/_write_rows/_flush/_sync/_close; those only ever run on the writer
+    thread.
+    """
+    # Sinks that record the run itself (not just rows) open before the first row arrives
+    open_eagerly = False
+    # Whether checkpoint() really puts the rows on disk; crawls can only be resumed from durable sinks
+    durable = True
+
+    def __init__(self, batch_size=500, flush_interval=5.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._commands = queue.Queue()
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"{type(self).__name__}-writer", daemon=True)
+        self._thread.start()
+
+    # --- caller side -------------------------------------------------------
+
+    def write(self, listings):
+        self._raise_error()
+        if listings:
+            self._commands.put(("rows", list(listings)))
+
+    def checkpoint(self, callback=None):
+        """Flush and fsync everything written so far, then call `callback` on the writer thread."""
+        self._raise_error()
+        self._commands.put(("checkpoint", callback))
+
+    def sync(self):
+        """Block until everything written so far is on disk."""
+        done = threading.Event()
+        self.checkpoint(done.set)
+        while not done.wait(0.1):
+            self._raise_error()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._commands.put(("close", None))
+            self._thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError(f"{type(self).__name__} writer failed: {self._error}") from self._error
+
+    # --- writer thread -----------------------------------------------------
+
+    def _run(self):
+        buffer = []
+        last_flush = time.monotonic()
+        opened = False
+        try:
+            if self.open_eagerly:
+                self._open()
+                opened = True
+            while True:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+                try:
+                    command, payload = self._commands.get(timeout=timeout if buffer else None)
+                except queue.Empty:
+                    command, payload = "flush", None
+
+                if command == "rows":
+                    buffer.extend(payload)
+                    if len(buffer) < self.batch_size:
+                        continue
+
+                # Nothing is created on disk until the first row arrives
+                if buffer:
+                    if not opened:
+                        self._open()
+                        opened = True
+                    self._write_rows(buffer)
+                    self.rows_written += len(buffer)
+                    buffer = []
+                if opened:
+                    self._flush()
+                last_flush = time.monotonic()
+
+                if command == "checkpoint":
+                    if opened:
+                        self._sync()
+                    if payload is not None:
+                        payload()
+                elif command == "close":
+                    if opened:
+                        self._close()
+                    return
+        except Exception as e:
+            self._error = e
+            # Keep draining so callers waiting on a checkpoint or close are released
+            while True:
+                command, payload = self._commands.get()
+                if command == "close":
+                    return
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write_rows(self, rows):
+        raise NotImplementedError
+
+    def _flush(self):
+        pass
+
+    def _sync(self):
+        pass
+
+    def _close(self):
+        pass
+
+class CsvSink(ListingSink):
+    """Appends listing rows to one CSV file that stays open for the whole run.
+
+    Paths ending in .gz or .zst are compressed as they are written.
+    """
+    def __init__(self, path, append=False, batch_size=500, flush_interval=5.0):
+        self.path = path
+        self.append = append
+        self._file = None
+        self._writer = None
+        super().__init__(batch_size, flush_interval)
+
+    def _open(self):
+        # Appending to a missing or empty file still needs the header
+        write_header = not self.append or not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open_text_output(self.path, self.append)
+        self._writer = csv.DictWriter(self._file, fieldnames=LISTING_FIELDS)
+        if write_header:
+            self._writer.writeheader()
+
+    def _write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def _flush(self):
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.close()
+
+class JsonlSink(ListingSink):
+    """Writes one JSON object per listing per line, compressed for .gz and .zst paths.
+
+    Uses orjson when it is installed.
+    """
+    def __init__(self, path, append=False, batch_size=500, flush_interval=5.0):
+        self.path = path
+        self.append = append
+        self._file = None
+        super().__init__(batch_size, flush_interval)
+
+    def _open(self):
+        self._file = open_text_output(self.path, self.append)
+
+    def _write_rows(self, rows):
+        if orjson is not None:
+            self._file.write("".join(orjson.dumps(row).decode("utf-8") + "\n" for row in rows))
+        else:
+            self._file.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+
+    def _flush(self):
+        self._file.flush()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.close()
+
+class SqliteSink(ListingSink):
+    """Upserts listings into a SQLite database shared across runs.
+
+    `listings` holds the latest row per Listing ID with numeric min/max price
+    and size columns, `observations` records which run saw which listing, and
+    `runs` has one row per crawl. The database runs in WAL mode and every batch
+    is one executemany upsert inside a single transaction.
+    """
+    open_eagerly = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at TEXT NOT NULL,
+            finished_at TEXT,
+            source_url TEXT,
+            rows_written INTEGER DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS listings (
+            listing_id TEXT PRIMARY KEY,
+            url TEXT,
+            address TEXT,
+            location TEXT,
+            postal_code TEXT,
+            company TEXT,
+            price TEXT,
+            price_min REAL,
+            price_max REAL,
+            cap_rate TEXT,
+            size TEXT,
+            size_min REAL,
+            size_max REAL,
+            images TEXT,
+            first_seen_run INTEGER,
+            last_seen_run INTEGER,
+            first_seen_at TEXT,
+            last_seen_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS observations (
+            run_id INTEGER NOT NULL,
+            listing_id TEXT NOT NULL,
+            observed_at TEXT NOT NULL,
+            price_min REAL,
+            price_max REAL,
+            size_min REAL,
+            size_max REAL,
+            PRIMARY KEY (run_id, listing_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_listings_postal_code ON listings (postal_code);
+        CREATE INDEX IF NOT EXISTS idx_listings_location ON listings (location);
+        CREATE INDEX IF NOT EXISTS idx_listings_company ON listings (company);
+        CREATE INDEX IF NOT EXISTS idx_listings_price_min ON listings (price_min);
+        CREATE INDEX IF NOT EXISTS idx_listings_price_max ON listings (price_max);
+        CREATE INDEX IF NOT EXISTS idx_listings_size_min ON listings (size_min);
+        CREATE INDEX IF NOT EXISTS idx_listings_size_max ON listings (size_max);
+        CREATE INDEX IF NOT EXISTS idx_observations_listing ON observations (listing_id);
+    """
+
+    UPSERT_LISTING = """
+        INSERT INTO listings (
+            listing_id, url, address, location, postal_code, company,
+            price, price_min, price_max, cap_rate, size, size_min, size_max, images,
+            first_seen_run, last_seen_run, first_seen_at, last_seen_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (listing_id) DO UPDATE SET
+            url = excluded.url,
+            address = excluded.address,
+            location = excluded.location,
+            postal_code = excluded.postal_code,
+            company = excluded.company,
+            price = excluded.price,
+            price_min = excluded.price_min,
+            price_max = excluded.price_max,
+            cap_rate = excluded.cap_rate,
+            size = excluded.size,
+            size_min = excluded.size_min,
+            size_max = excluded.size_max,
+            images = excluded.images,
+            last_seen_run = excluded.last_seen_run,
+            last_seen_at = excluded.last_seen_at
+    """
+
+    UPSERT_OBSERVATION = """
+        INSERT OR REPLACE INTO observations (run_id, listing_id, observed_at, price_min, price_max, size_min, size_max)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def __init__(self, path, source_url=None, batch_size=500, flush_interval=5.0):
+        self.path = path
+        self.source_url = source_url
+        self.run_id = None
+        self.rows_skipped = 0
+        self._conn = None
+        super().__init__(batch_size, flush_interval)
+
+    def _open(self):
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        cursor = self._conn.execute(
+            "INSERT INTO runs (started_at, source_url) VALUES (?, ?)",
+            (datetime.now().isoformat(timespec="seconds"), self.source_url),
+        )
+        self.run_id = cursor.lastrowid
+        self._conn.commit()
+
+    def _write_rows(self, rows):
+        now = datetime.now().isoformat(timespec="seconds")
+        listing_rows = []
+        observation_rows = []
+        for row in rows:
+            listing_id = row.get("Listing ID", "")
+            if not listing_id:
+                # Without an ID there is nothing to upsert on
+                self.rows_skipped += 1
+                continue
+            price_min, price_max = parse_number_range(row.get("Price (CAD/SF/Year)"))
+            size_min, size_max = parse_number_range(row.get("Size (SF)"))
+            listing_rows.append((
+                listing_id, row.get("URL"), row.get("Address"), row.get("Location"), row.get("Postal Code"),
+                row.get("Company"), row.get("Price (CAD/SF/Year)"), price_min, price_max, row.get("Cap Rate"),
+                row.get("Size (SF)"), size_min, size_max, row.get("Images"),
+                self.run_id, self.run_id, now, now,
+            ))
+            observation_rows.append((self.run_id, listing_id, now, price_min, price_max, size_min, size_max))
+
+        with self._conn:
+            self._conn.executemany(self.UPSERT_LISTING, listing_rows)
+            self._conn.executemany(self.UPSERT_OBSERVATION, observation_rows)
+            self._conn.execute(
+                "UPDATE runs SET rows_written = rows_written + ? WHERE run_id = ?",
+                (len(listing_rows), self.run_id),
+            )
+
+    def _sync(self):
+        # Commits are not fsynced under synchronous=NORMAL; a full WAL checkpoint makes them durable
+        self._conn.execute("PRAGMA wal_checkpoint(FULL)")
+
+    def _close(self):
+        with self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                (datetime.now().isoformat(timespec="seconds"), self.run_id),
+            )
+        self._conn.close()
+
+class ParquetSink(ListingSink):
+    """Writes listings to a typed Parquet file, one row group at a time.
+
+    Price and size ranges get numeric min/max columns next to the original
+    text, Images becomes a list column, and repeated text columns (Location,
+    Company, ...) are dictionary-encoded. Rows are written to `<path>.partial`
+    and renamed into place on close, so a finished file is always complete.
+    Rows are held in memory until `row_group_size` of them fill a row group.
+    A Parquet file cannot be appended to, so with `append=True` the existing
+    file's rows are copied into the new one first. Rows still in an unclosed
+    .partial file are lost if the process dies, so the sink is not durable:
+    crawls into it are not checkpointed and cannot be resumed or incremental.
+    """
+    durable = False
+    DICTIONARY_COLUMNS = ["Location", "Postal Code", "Company", "Cap Rate"]
+
+    def __init__(self, path, append=False, row_group_size=2_000, batch_size=500, flush_interval=5.0):
+        if pa is None:
+            raise ValueError("Parquet output needs pyarrow, which is not installed")
+        self.path = str(path)
+        self.append = append
+        self.row_group_size = row_group_size
+        self._partial_path = self.path + ".partial"
+        self._pending = []
+        self._writer = None
+        super().__init__(batch_size, flush_interval)
+
+    @classmethod
+    def schema(cls):
+        dictionary_string = pa.dictionary(pa.int32(), pa.string())
+        return pa.schema([
+            ("Listing ID", pa.string()),
+            ("URL", pa.string()),
+            ("Address", pa.string()),
+            ("Location", dictionary_string),
+            ("Postal Code", dictionary_string),
+            ("Company", dictionary_string),
+            ("Price (CAD/SF/Year)", pa.string()),
+            ("Price Min (CAD/SF/Year)", pa.float64()),
+            ("Price Max (CAD/SF/Year)", pa.float64()),
+            ("Cap Rate", dictionary_string),
+            ("Size (SF)", pa.string()),
+            ("Size Min (SF)", pa.float64()),
+            ("Size Max (SF)", pa.float64()),
+            ("Images", pa.list_(pa.string())),
+        ])
+
+    @staticmethod
+    def typed_row(row):
+        price_min, price_max = parse_number_range(row.get("Price (CAD/SF/Year)"))
+        size_min, size_max = parse_number_range(row.get("Size (SF)"))
+        images = row.get("Images") or ""
+        typed = {field: row.get(field) for field in LISTING_FIELDS}
+        typed.update({
+            "Price Min (CAD/SF/Year)": price_min,
+            "Price Max (CAD/SF/Year)": price_max,
+            "Size Min (SF)": size_min,
+            "Size Max (SF)": size_max,
+            "Images": images.split(" | ") if images else [],
+        })
+        return typed
+
+    def _open(self):
+        schema = self.schema()
+        self._writer = pq.ParquetWriter(
+            self._partial_path, schema, compression="zstd", use_dictionary=self.DICTIONARY_COLUMNS
+        )
+        if self.append and os.path.exists(self.path):
+            existing = pq.ParquetFile(self.path)
+            for index in range(existing.num_row_groups):
+                self._writer.write_table(existing.read_row_group(index).cast(schema))
+
+    def _write_rows(self, rows):
+        self._pending.extend(self.typed_row(row) for row in rows)
+        while len(self._pending) >= self.row_group_size:
+            self._write_row_group()
+
+    def _write_row_group(self):
+        if self._pending:
+            rows = self._pending[:self.row_group_size]
+            self._writer.write_table(pa.Table.from_pylist(rows, schema=self._writer.schema))
+            self._pending = self._pending[self.row_group_size:]
+
+    def _close(self):
+        while self._pending:
+            self._write_row_group()
+        self._writer.close()
+        os.replace(self._partial_path, self.path)
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+def sink_class_for(path):
+    """ListingSink subclass for `path`, picked from its extension.
+
+    .db/.sqlite -> SqliteSink, .parquet -> ParquetSink, .jsonl/.ndjson -> JsonlSink,
+    anything else -> CsvSink. CSV and JSON Lines may end in .gz or .zst to compress.
+    """
+    lowered = str(path).lower()
+    if lowered.endswith(SQLITE_SUFFIXES):
+        return SqliteSink
+    if lowered.endswith(".parquet"):
+        return ParquetSink
+    if _base_suffix(path) in JSONL_SUFFIXES:
+        return JsonlSink
+    return CsvSink
+
+def open_sink(path, append=False, source_url=None):
+    """Open the sink for `path`, picking the format from its extension (see sink_class_for)."""
+    sink_class = sink_class_for(path)
+    if sink_class is SqliteSink:
+        return SqliteSink(path, source_url=source_url)
+    return sink_class(path, append=append)
@@ -12,6 +12,13 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, ".."))
 LOCAL_VERSION_FILE = os.path.abspath(os.path.join(SCRIPT_DIR, "..", "versions.txt"))
 
+# Crawl outputs (any sink format) are the user's data, never deleted or overwritten by an update
+OUTPUT_SUFFIXES = ('.csv', '.jsonl', '.ndjson', '.parquet', '.parquet.partial', '.db', '.sqlite', '.sqlite3')
+SQLITE_SIDE_SUFFIXES = ('-wal', '-shm', '-journal')
+COMPRESSED_SUFFIXES = ('.gz', '.zst')
+# Per-output side files: resume checkpoints (checkpoint.py) and failed-page lists (dead_letters.py)
+OUTPUT_STATE_SUFFIXES = ('.checkpoint.json', '.failed.json')
+
 
 
 def get_remote_version_info():
@@ -20,6 +27,18 @@ def get_remote_version_info():
         return lines[-1].strip()  # Return full latest line
 
 
+def is_output_file(name):
+    """Whether `name` is a crawl output or its state, e.g. listings.db-wal, out.jsonl.zst or out.csv.checkpoint.json."""
+    lowered = name.lower()
+    if lowered.endswith(OUTPUT_STATE_SUFFIXES):
+        return True
+    for suffix in SQLITE_SIDE_SUFFIXES + COMPRESSED_SUFFIXES:
+        if lowered.endswith(suffix):
+            lowered = lowered[:-len(suffix)]
+            break
+    return lowered.endswith(OUTPUT_SUFFIXES)
+
+
 def parse_version_line(line):
     """Split '1.2.0: something' into ('1.2.0', 'something')"""
     if ":" in line:
@@ -76,8 +95,8 @@ def download_and_replace_update(zip_url, extract_to=PROJECT_ROOT):
                 new_files.append(rel_path)
 
         # Folders or files to exclude from deletion
-        exclude_paths = set()
-        exclude_dirs = {'.git', '.svn', '__pycache__', '_temp_update'}
+        exclude_paths = {os.path.join('src', name) for name in ('listing_index.db', 'listing_index.db-wal', 'listing_index.db-shm', 'seen_listings.idx', 'search_cache.json')}
+        exclude_dirs = {'.git', '.svn', '__pycache__', '_temp_update', 'page_cache'}
 
         # Delete files in extract_to NOT in new_files (except excluded)
         for root, dirs, files in os.walk(extract_to):
@@ -86,8 +105,8 @@ def download_and_replace_update(zip_url, extract_to=PROJECT_ROOT):
 
             for file in files:
                 rel_path = os.path.relpath(os.path.join(root, file), extract_to)
-                # Skip .csv files during deletion
-                if file.endswith('.csv'):
+                # Skip crawl outputs during deletion
+                if is_output_file(file):
                     continue
                 if rel_path not in new_files and rel_path not in exclude_paths:
                     file_to_delete = os.path.join(root, file)
@@ -100,8 +119,8 @@ def download_and_replace_update(zip_url, extract_to=PROJECT_ROOT):
 
         # Now move new files from extracted folder to extract_to, overwriting
         for rel_path in new_files:
-            # Skip .csv files during overwrite
-            if rel_path.endswith('.csv'):
+            # Skip crawl outputs during overwrite
+            if is_output_file(rel_path):
                 continue
             src_file = os.path.join(root_folder, rel_path)
             dst_file = os.path.join(extract_to, rel_path)